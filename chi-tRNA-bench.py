@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+'''
+Benchmark harness for Chimeric tRNAscanner (chi-tRNA).
+
+Writes synthetic tRNAscan-SE 2.0 output tables of any size, times each stage of
+Module_Scanner on them (parse, encode and filter, chimera detection, cell
+counts, supplemental report, render) together with the end to end command line,
+records peak memory, and saves everything as JSON so runs can be compared.
+
+The synthetic tables use the same three header lines and column layout as
+tRNAscan-SE 2.0 with isotype scores: tRNA type in column 5, anticodon in
+column 6, Inf score in column 9, isotype in column 11 and isotype score last.
+
+input: chi-tRNA-bench.py --rows 1000 100000 1000000 --out bench.json
+
+output: JSON file with one record per (rows, stage) and a printed table
+
+To only write a synthetic table:
+chi-tRNA-bench.py --generate genome.out --rows 100000 --chimera-rate 0.02
+'''
+import sys
+import os
+import json
+import time
+import random
+import importlib.util
+import subprocess
+import tracemalloc
+
+def load_chitrna():
+    '''Import chi-tRNA.py from the folder of this script (its name is not a valid module name)'''
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'chi-tRNA.py')
+    spec = importlib.util.spec_from_file_location('chi_tRNA', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module, path
+
+#standard genetic code in TCAG order, used to give each anticodon its tRNA type
+bases = 'TCAG'
+code = 'FFLLSSSSYY**CC*WLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG'
+names = {'A': 'Ala', 'R': 'Arg', 'N': 'Asn', 'D': 'Asp', 'C': 'Cys',
+         'Q': 'Gln', 'E': 'Glu', 'G': 'Gly', 'H': 'His', 'I': 'Ile',
+         'L': 'Leu', 'K': 'Lys', 'M': 'Met', 'F': 'Phe', 'P': 'Pro',
+         'S': 'Ser', 'T': 'Thr', 'W': 'Trp', 'Y': 'Tyr', 'V': 'Val'}
+stops = {'TCA': 'SeC', 'CTA': 'Pyl', 'TTA': 'Sup'} #anticodons of TGA, TAG and TAA
+
+def anticodon_types():
+    '''Map every anticodon to the tRNA type tRNAscan-SE would give it'''
+    complement = {'A': 'T', 'C': 'G', 'G': 'C', 'T': 'A'}
+    types = {}
+    for first in bases:
+        for second in bases:
+            for third in bases:
+                anticodon = first + second + third
+                codon = ''.join(complement[base] for base in reversed(anticodon))
+                amino_acid = code[16 * bases.index(codon[0]) + 4 * bases.index(codon[1]) + bases.index(codon[2])]
+                types[anticodon] = stops[anticodon] if amino_acid == '*' else names[amino_acid]
+    return types
+
+header = ('Sequence\t\ttRNA\tBounds\ttRNA\tAnti\tIntron Bounds\t\tInf\t\tIsotype\tIsotype\n'
+          'Name    \ttRNA #\tBegin\tEnd\tType\tCodon\tBegin\tEnd\tScore\tNote\tCM\tScore\n'
+          '--------\t------\t-----\t------\t----\t-----\t-----\t----\t------\t------\t-------\t-------\n')
+
+def generate(fname, rows, chimera_rate = 0.02, score_mean = 60.0, score_sd = 15.0,
+             mix = 'skewed', sequences = 50, seed = 0):
+    '''
+    Write a synthetic tRNAscan-SE 2.0 table of rows tRNAs to fname.
+
+    chimera_rate: fraction of tRNAs whose isotype is a different amino acid
+    score_mean, score_sd: normal distribution of Inf and isotype scores, clipped to 0-120
+    mix: 'uniform' anticodon usage, or 'skewed' (Zipf-like, as in real genomes)
+    sequences: number of distinct sequence names the tRNAs are spread over
+    '''
+    rand = random.Random(seed)
+    types = anticodon_types()
+    anticodons = sorted(types)
+    if mix == 'uniform':
+        weights = [1.0] * len(anticodons)
+    else:
+        weights = [1.0 / rank for rank in range(1, len(anticodons) + 1)]
+        rand.shuffle(weights)
+    isotypes = sorted(set(names.values())) + ['SeC'] #isotypes a chimera can be given
+    picks = rand.choices(anticodons, weights, k = rows)
+    with open(fname, 'w', buffering = 2**20) as f:
+        f.write(header)
+        lines = []
+        for number, anticodon in enumerate(picks):
+            tRNA = types[anticodon]
+            isotype = tRNA
+            if rand.random() < chimera_rate:
+                isotype = rand.choice(isotypes)
+            if tRNA == 'Met' and rand.random() < 0.3:
+                isotype = 'iMet'
+            begin = 1000 * number + rand.randrange(900)
+            inf = min(120.0, max(0.0, rand.gauss(score_mean, score_sd)))
+            iso = min(120.0, max(0.0, rand.gauss(score_mean, score_sd)))
+            lines.append('chr%d\t%d\t%d\t%d\t%s\t%s\t0\t0\t%.1f\t\t%s\t%.1f\n'
+                         % (number % sequences + 1, number + 1, begin, begin + 72, tRNA, anticodon, inf, isotype, iso))
+            if len(lines) == 10000:
+                f.writelines(lines)
+                lines = []
+        f.writelines(lines)
+
+stages = ('parse', 'encode+filter', 'chimeras', 'counts', 'report', 'render')
+
+def run_stages(chitrna, fname, option, cut, render, scratch):
+    '''Run every stage once on a fresh scanner, return {stage: seconds}'''
+    computing = chitrna.Module_Scanner(fname, cut, option, 'bench', None, 'y', 'inf') #isotype column from the header, as on the command line
+    steps = {'parse': computing.load,
+             'encode+filter': computing.project,
+             'chimeras': computing.chimeras,
+             'counts': computing.counts,
+             'report': lambda: chitrna.write_supplemental(computing, os.path.join(scratch, 'report.txt')),
+             'render': lambda: computing.plot('density', output = os.path.join(scratch, 'figure.png'))}
+    seconds = {}
+    for stage in stages:
+        if stage == 'render' and not render:
+            continue
+        start = time.perf_counter()
+        steps[stage]()
+        seconds[stage] = time.perf_counter() - start
+    return seconds
+
+def peak_memory(chitrna, fname, option, cut, scratch):
+    '''Peak Python heap allocated during each stage (render excluded), measured with tracemalloc'''
+    computing = chitrna.Module_Scanner(fname, cut, option, 'bench', None, 'y', 'inf') #isotype column from the header, as on the command line
+    steps = (('parse', computing.load), ('encode+filter', computing.project),
+             ('chimeras', computing.chimeras), ('counts', computing.counts),
+             ('report', lambda: chitrna.write_supplemental(computing, os.path.join(scratch, 'report.txt'))))
+    peaks = {}
+    tracemalloc.start()
+    for stage, step in steps:
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        step()
+        peaks[stage] = tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+    return peaks
+
+def run_cli(path, fname, option, cut):
+    '''Time the command line end to end (report only, no figure), return seconds and peak RSS in bytes'''
+    command = [sys.executable, path, fname, '-o', option, '-i', str(cut), '--stats']
+    if sys.platform.startswith('win'):
+        start = time.perf_counter()
+        subprocess.run(command, check = True, stdout = subprocess.DEVNULL)
+        return time.perf_counter() - start, None
+    start = time.perf_counter()
+    child = subprocess.Popen(command, stdout = subprocess.DEVNULL)
+    usage = os.wait4(child.pid, 0)[2]
+    seconds = time.perf_counter() - start
+    scale = 1 if sys.platform == 'darwin' else 1024 #ru_maxrss is KB on Linux, bytes on macOS
+    return seconds, usage.ru_maxrss * scale
+
+def main(argv = None):
+    import argparse
+    import platform
+    import tempfile
+    parser = argparse.ArgumentParser(description = 'Benchmark chi-tRNA on synthetic tRNAscan-SE 2.0 tables.')
+    parser.add_argument('--rows', type = int, nargs = '+', default = [1000, 10000, 100000], help = 'table sizes to benchmark (or to generate with --generate)')
+    parser.add_argument('--generate', action = 'store', help = 'only write one synthetic table to this file and exit')
+    parser.add_argument('--chimera-rate', type = float, default = 0.02, help = 'fraction of tRNAs whose isotype disagrees with their type')
+    parser.add_argument('--score-mean', type = float, default = 60.0, help = 'mean Inf and isotype score')
+    parser.add_argument('--score-sd', type = float, default = 15.0, help = 'standard deviation of the scores')
+    parser.add_argument('--mix', choices = ('skewed', 'uniform'), default = 'skewed', help = 'anticodon usage')
+    parser.add_argument('--seed', type = int, default = 0, help = 'random seed of the generator')
+    parser.add_argument('-o', '--option', choices = ('aa', 'anticodon'), default = 'aa', help = 'X-axis used by the scanner')
+    parser.add_argument('-i', '--infscore', type = float, default = 0, help = 'score cut off used by the scanner')
+    parser.add_argument('--repeat', type = int, default = 3, help = 'timing runs per size; the fastest is kept')
+    parser.add_argument('--no-render', action = 'store_true', help = 'skip the render stage (no matplotlib needed)')
+    parser.add_argument('--no-cli', action = 'store_true', help = 'skip the end to end command line timing')
+    parser.add_argument('--keep', action = 'store', help = 'folder to keep the generated tables in')
+    parser.add_argument('--out', action = 'store', default = 'chi-tRNA-bench.json', help = 'JSON results file')
+    args = parser.parse_args(argv)
+
+    if args.generate:
+        generate(args.generate, args.rows[0], args.chimera_rate, args.score_mean, args.score_sd, args.mix, seed = args.seed)
+        return
+
+    chitrna, path = load_chitrna()
+    scratch = args.keep or tempfile.mkdtemp(prefix = 'chi-tRNA-bench-')
+    os.makedirs(scratch, exist_ok = True)
+    results = []
+    print('Rows\tStage\tSeconds\tPeak bytes')
+    for rows in args.rows:
+        fname = os.path.join(scratch, 'synthetic-%d.out' % rows)
+        if not os.path.exists(fname):
+            generate(fname, rows, args.chimera_rate, args.score_mean, args.score_sd, args.mix, seed = args.seed)
+        best = {}
+        for run in range(args.repeat):
+            for stage, seconds in run_stages(chitrna, fname, args.option, args.infscore, not args.no_render, scratch).items():
+                best[stage] = min(seconds, best.get(stage, seconds))
+        peaks = peak_memory(chitrna, fname, args.option, args.infscore, scratch)
+        if not args.no_cli:
+            best['cli'], peaks['cli'] = min(run_cli(path, fname, args.option, args.infscore) for run in range(args.repeat))
+        for stage, seconds in best.items():
+            results.append({'rows': rows, 'stage': stage, 'seconds': seconds, 'peak_bytes': peaks.get(stage)})
+            print('%d\t%s\t%.4f\t%s' % (rows, stage, seconds, peaks.get(stage)))
+        if not args.keep:
+            os.remove(fname)
+
+    with open(args.out, 'w') as f:
+        json.dump({'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                   'python': platform.python_version(),
+                   'platform': platform.platform(),
+                   'numpy': chitrna.np.__version__ if chitrna.np is not None else None,
+                   'settings': {'option': args.option, 'infscore': args.infscore,
+                                'chimera_rate': args.chimera_rate, 'score_mean': args.score_mean,
+                                'score_sd': args.score_sd, 'mix': args.mix, 'seed': args.seed,
+                                'repeat': args.repeat},
+                   'results': results}, f, indent = 1)
+    print('Results written to', args.out)
+
+if __name__ == "__main__":
+    main()
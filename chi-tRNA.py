@@ -1,6 +1,16 @@
 #!/usr/bin/env python3
-import matplotlib.pyplot as plt
 import sys
+import os
+import io
+import time
+import json
+from array import array
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+try:
+    import numpy as np
+except ImportError: #numpy is optional, the plain Python path is used without it
+    np = None
 
 '''
 The purpose of Chimeric tRNAscanner (chi-tRNA) is to visually dispaly tRNA oddities in species.
@@ -36,6 +46,115 @@ Author: Tanvir Singh Saini
 Date: June 5, 2016
 '''
 
+def pyplot(headless = False):
+    '''
+    Import matplotlib.pyplot on first use, so runs that never draw a figure do not
+    load it. headless selects the non-interactive Agg backend, used when the
+    figure is written to a file, e.g. on cluster nodes without a display.
+    '''
+    import matplotlib
+    if headless:
+        matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    return plt
+
+class BlockReader(io.RawIOBase):
+    '''Read-only raw stream over an iterator of decompressed byte chunks'''
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.rest = memoryview(b'')
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not len(self.rest):
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                return 0
+            self.rest = memoryview(chunk)
+        size = min(len(buffer), len(self.rest))
+        buffer[:size] = self.rest[:size]
+        self.rest = self.rest[size:]
+        return size
+
+def bgzf_members(f):
+    '''
+    Yield the raw gzip members of a BGZF (bgzip) file one by one. Each member
+    header carries its own compressed size (the BC extra field), so members
+    are split off without inflating anything.
+    '''
+    while True:
+        head = f.read(12)
+        if not head:
+            return
+        extra = f.read(int.from_bytes(head[10:12], 'little'))
+        size = None
+        position = 0
+        while position + 4 <= len(extra): #find the BC subfield among the extra subfields
+            length = int.from_bytes(extra[position + 2:position + 4], 'little')
+            if extra[position:position + 2] == b'BC':
+                size = int.from_bytes(extra[position + 4:position + 6], 'little') + 1
+            position += 4 + length
+        if head[:2] != b'\x1f\x8b' or size is None:
+            raise ValueError('not a BGZF member')
+        yield head + extra + f.read(size - 12 - len(extra))
+
+def bgzf_chunks(fname, workers):
+    '''
+    Inflate the members of a BGZF file in a thread pool (zlib releases the GIL)
+    and yield the decompressed chunks in file order. At most a few members per
+    worker are in flight, so memory stays bounded.
+    '''
+    import zlib
+    from concurrent.futures import ThreadPoolExecutor
+    from itertools import islice
+    window = workers * 8
+    with open(fname, 'rb') as f, ThreadPoolExecutor(max_workers = workers) as pool:
+        members = bgzf_members(f)
+        while True:
+            batch = list(islice(members, window))
+            if not batch:
+                return
+            for chunk in pool.map(lambda member: zlib.decompress(member, 31), batch):
+                yield chunk
+
+def open_scan(fname, workers = None):
+    '''
+    Open a tRNAscan-SE output as text, whether it is plain or compressed.
+    The format is found from the first bytes of the file: bgzip (BGZF) files
+    are decompressed in parallel across blocks, other gzip files (one or many
+    members) with gzip, bzip2 and xz with their modules, and zstd with the
+    standard library module when present (Python 3.14+) or with zstandard.
+    '''
+    with open(fname, 'rb') as f:
+        head = f.read(18)
+    if head[:2] == b'\x1f\x8b': #gzip
+        if head[3] & 4 and head[12:14] == b'BC': #FEXTRA with the BGZF subfield first
+            workers = workers or os.cpu_count() or 1
+            return io.TextIOWrapper(io.BufferedReader(BlockReader(bgzf_chunks(fname, workers)), 2**20))
+        import gzip
+        return gzip.open(fname, 'rt')
+    if head[:4] == b'\x28\xb5\x2f\xfd': #zstd
+        try:
+            from compression import zstd
+            return zstd.open(fname, 'rt')
+        except ImportError:
+            pass
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError(fname + ' is zstd compressed; install the zstandard module to read it') from None
+        return io.TextIOWrapper(zstandard.ZstdDecompressor().stream_reader(open(fname, 'rb'), closefd = True))
+    if head[:3] == b'BZh':
+        import bz2
+        return bz2.open(fname, 'rt')
+    if head[:6] == b'\xfd7zXZ\x00':
+        import lzma
+        return lzma.open(fname, 'rt')
+    return open(fname)
+
 class CommandLine() :
     '''
     Handle the command line, usage and help requests.
@@ -67,19 +186,496 @@ class CommandLine() :
                                              prefix_chars = '-',
                                              usage = '%(prog)s file.txt -i 90 -o anticodon -s N -t "tRNA Graph" -m 12'
                                              )
-        self.parser.add_argument('inFile', action = 'store', help='input file name')
+        self.parser.add_argument('inFile', action = 'store', nargs = '?', help='input file name (not needed with --serve)')
         self.parser.add_argument('-i', '--infscore', type = float ,action = 'store', help='infernal Score cut off for tRNA expression')
-        self.parser.add_argument('-o', '--option', action = 'store', help='use aa(amino acid) or anticodon for the X-axis')
+        self.parser.add_argument('-o', '--option', action = 'store', help='use aa(amino acid) or anticodon for the X-axis; with --figures both may be given as aa,anticodon')
         self.parser.add_argument('-s', '--supplemental' , action = 'store', help = 'select y/N to output a text file with chimeric tRNAs')
         self.parser.add_argument('-t', '--title', action = 'store', help = 'title graph; example input "Yeast tRNAs"')
-        self.parser.add_argument('-m', '--mod', type = int, action = 'store', help='modify the column entry for the isoType')
+        self.parser.add_argument('-m', '--mod', type = int, action = 'store', help='column number of the isotype; by default the Isotype CM column is found from the header')
         self.parser.add_argument('-f', '--filter', action = 'store', help = 'change score filter from Inf score to Isotype score' )
+        self.parser.add_argument('-b', '--batch', action = 'store_true', help = 'treat inFile as a directory, glob pattern or manifest file and scan every file in parallel')
+        self.parser.add_argument('-w', '--workers', type = int, action = 'store', help = 'number of worker processes for batch mode; default is one per core')
+        self.parser.add_argument('--summary', action = 'store', default = 'chi-tRNA-summary.txt', help = 'combined summary table written by batch mode')
+        self.parser.add_argument('--stream', action = 'store_true', help = 'read the file row by row in constant memory and print the point counts instead of plotting')
+        self.parser.add_argument('-c', '--cache', action = 'store', help = 'folder for the binary cache of parsed files; repeat runs skip text parsing')
+        self.parser.add_argument('--cache-size', type = float, action = 'store', default = 512, help = 'size cap of the cache folder in MB, least recently used entries are removed first')
+        self.parser.add_argument('--sweep', type = float, nargs = 3, metavar = ('START', 'STOP', 'N'), help = 'report passing and chimeric tRNAs for N evenly spaced score cut offs from START to STOP instead of plotting')
+        self.parser.add_argument('-r', '--render', action = 'store', default = 'density', choices = ('points', 'density', 'bubble', 'heatmap'), help = 'draw every tRNA (points), or one mark per type/isotype cell: density (default, looks like points), bubble or heatmap')
+        self.parser.add_argument('-O', '--output', action = 'store', help = 'save the graph to this file (.png, .svg or .pdf) without opening a window')
+        self.parser.add_argument('-n', '--no-plot', action = 'store_true', help = 'do not draw the graph, e.g. with -s y to only write the chimeric tRNAs')
+        self.parser.add_argument('--stats', action = 'store_true', help = 'print the number of tRNAs, passing tRNAs and chimeric tRNAs instead of plotting')
+        self.parser.add_argument('--profile', action = 'store', metavar = 'JSON', help = 'time each stage, record its peak memory and row counters, print a summary and save it to this JSON file')
+        self.parser.add_argument('--report-format', action = 'store', default = 'tsv', choices = ('tsv', 'bin'), help = 'supplemental report as tab separated text (default) or compact binary')
+        self.parser.add_argument('--compare', action = 'store_true', help = 'treat inFile like --batch and build one species by type/isotype count matrix with a clustered heatmap')
+        self.parser.add_argument('--matrix', action = 'store', default = 'chi-tRNA-matrix.tsv', help = 'matrix file written by --compare; .npz stores it sparse with NumPy')
+        self.parser.add_argument('--chimeric-only', action = 'store_true', help = 'with --compare, keep only the cells off the normal line')
+        self.parser.add_argument('--serve', action = 'store', metavar = 'ADDRESS', help = 'run a local analysis server on HOST:PORT (e.g. 127.0.0.1:8765) or unix:/path/to.sock')
+        self.parser.add_argument('--memory', type = float, action = 'store', default = 1024, help = 'memory in MB for the parsed tables kept by --serve')
+        self.parser.add_argument('--follow', type = float, action = 'store', metavar = 'SECONDS', help = 'follow a file that is still being written, updating the counts, report and graph (-O) or stats every SECONDS')
+        self.parser.add_argument('--idle', type = float, action = 'store', metavar = 'SECONDS', help = 'with --follow, stop once the file has not grown for SECONDS')
+        self.parser.add_argument('--figures', action = 'store', metavar = 'FOLDER', help = 'treat inFile like --batch and save a figure of every file to FOLDER, drawn in parallel without a display')
+        self.parser.add_argument('--grid', action = 'store', metavar = 'ROWSxCOLUMNS', help = 'with --figures, draw the files as small multiples, e.g. 4x5 panels per page')
+        self.parser.add_argument('--figure-format', action = 'store', default = 'png', choices = ('png', 'svg', 'pdf'), help = 'file format of --figures')
         self.parser.add_argument('-v', '--version', action='version', version='%(prog)s 1.0')
         if inOpts is None :
             self.args = self.parser.parse_args()
         else :
             self.args = self.parser.parse_args(inOpts)
 
+class Schema:
+    '''
+    Column layout of one tRNAscan-SE output, read from its header.
+
+    tRNAscan-SE writes two title lines (then a line of dashes) whose words,
+    read down each column, name it: "Anti Codon", "Inf Score" (1.x: "Cove
+    Score"), "Isotype CM", "Isotype Score", and so on. The columns needed are
+    looked up by those names, so 1.x, 2.0 and 2.0 with isotype or extra score
+    columns are read alike. A header that cannot be read falls back to the
+    positions of the 2.0 isotype layout. mod, the isotype column from -m
+    (counted from 0), wins over the header.
+
+    attributes:
+    fields: column index of name, begin, end, type, anticodon, isotype,
+    Inf score and isotype score (None when the file has no isotype score)
+    known: False when the header was not recognised and legacy is used
+    '''
+
+
+    legacy = (0, 2, 3, 4, 5, 10, 8, -1) #positions used before the header was read
+
+    def __init__(self, titles, mod = None, filt = None):
+        '''
+        Resolve the columns from the first two title lines, split at tabs.
+        filt 'iso' requires an isotype score column.
+        '''
+        top = [title.strip() for title in titles[0]] if titles else []
+        names = [title.strip() for title in titles[1]] if 1 < len(titles) else []
+        top += [''] * (len(names) - len(top))
+        def find(name, above = None):
+            for column, title in enumerate(names):
+                if title == name and (above is None or top[column] in above):
+                    return column
+        self.known = find('Type') is not None and find('Codon') is not None
+        if not self.known: #not a tRNAscan-SE header we know
+            fields = list(Schema.legacy)
+        else:
+            fields = [0, find('Begin'), find('End'), find('Type'), find('Codon'),
+                      find('CM', ('Isotype',)), find('Score', ('Inf', 'Cove')), find('Score', ('Isotype',))]
+            #the top line may not line up with the second (e.g. "Intron Bounds" in one cell)
+            if fields[5] is None:
+                fields[5] = find('CM')
+            if fields[6] is None:
+                fields[6] = find('Score')
+            if fields[7] is None and names[-1] == 'Score' and fields[6] != len(names) - 1:
+                fields[7] = -1 #a last Score column that is not the Inf score, as before the header was read
+        if mod is not None:
+            fields[5] = mod
+        if fields[5] is None:
+            raise ValueError('no Isotype CM column in the header; give its column with -m')
+        if filt == 'iso' and fields[7] is None:
+            raise ValueError('no Isotype Score column in the header; it is needed by -f iso')
+        self.fields = tuple(fields)
+
+    @classmethod
+    def read(cls, f, mod = None, filt = None):
+        '''Read the three header lines from the open file f and resolve the columns'''
+        titles = [f.readline().rstrip('\r\n').split('\t') for number in range(3)]
+        return cls(titles, mod, filt)
+
+    def projection(self):
+        '''
+        Compile a function turning one line of the file into the tuple (name,
+        begin, end, type, anticodon, isotype, Inf score, isotype score) of
+        strings. Lines are split only as far as the last column needed.
+        '''
+        from operator import itemgetter
+        fields = self.fields
+        missing = fields[7] is None #no isotype score column, give nan
+        if missing:
+            fields = fields[:7]
+        last = -1 if min(fields) < 0 else max(fields) + 1 #number of splits, -1 for all
+        get = itemgetter(*fields)
+        if missing:
+            return lambda line: get(line.rstrip('\r\n').split('\t', last)) + ('nan',)
+        return lambda line: get(line.rstrip('\r\n').split('\t', last))
+
+class Labels:
+    '''
+    Dictionary encoded text column of a ScanTable. Each row holds a small
+    integer code into vocabulary, the list of distinct labels in order of first
+    appearance; columns built together share one vocabulary, so equal labels
+    get equal codes. Indexing and iterating give the labels back like a list.
+    '''
+
+    __slots__ = ('vocabulary', 'codes')
+
+    def __init__(self, vocabulary, codes):
+        self.vocabulary = vocabulary
+        self.codes = codes #array of codes, one per row
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, row):
+        return self.vocabulary[self.codes[row]]
+
+    def __iter__(self):
+        return map(self.vocabulary.__getitem__, self.codes)
+
+class ScanTable:
+    '''
+    Columnar, in-memory copy of one tRNAscan-SE output file.
+
+    The file is read and split exactly once; every stage of Module_Scanner
+    reads the columns it needs from here instead of calling parser() again.
+    Text columns are dictionary encoded (Labels) and numbers are kept in typed
+    arrays, so a tRNA takes about 40 bytes instead of a row of Python objects.
+
+    attributes:
+    names: sequence name of each tRNA (Labels with its own vocabulary)
+    types: tRNA type (amino acid) predicted from the anticodon
+    anticodons: anticodon of each tRNA
+    isotypes: predicted isotype, from the Isotype CM column or the -m column
+    (types, anticodons and isotypes are Labels sharing one vocabulary)
+    begins, ends: tRNA bounds on the sequence, as arrays of integers
+    inf_scores: Infernal score, as an array of floats
+    iso_scores: isotype score, as an array of floats (nan when the file has none)
+    '''
+
+    strings = ('names', 'types', 'anticodons', 'isotypes') #dictionary encoded
+    integers = ('begins', 'ends')
+    floats = ('inf_scores', 'iso_scores')
+    typecodes = {'names': 'I', 'types': 'H', 'anticodons': 'H', 'isotypes': 'H',
+                 'begins': 'q', 'ends': 'q', 'inf_scores': 'd', 'iso_scores': 'd'}
+
+    def __init__(self, rows):
+        '''Build the columns from projected rows, as given by rows() or parser()'''
+        names = {} #sequence name: code
+        labels = {} #type, anticodon or isotype: code
+        columns = {column: array(typecode) for column, typecode in ScanTable.typecodes.items()}
+        name, tRNA, anticodon, isotype = (columns[column].append for column in ScanTable.strings)
+        begins, ends, inf_scores, iso_scores = (columns[column].append for column in ScanTable.integers + ScanTable.floats)
+        for row in rows: #single pass, one append per column
+            name(names.setdefault(row[0], len(names)))
+            begins(int(row[1]))
+            ends(int(row[2]))
+            tRNA(labels.setdefault(row[3], len(labels)))
+            anticodon(labels.setdefault(row[4], len(labels)))
+            isotype(labels.setdefault(row[5], len(labels)))
+            inf_scores(float(row[6]))
+            iso_scores(float(row[7]))
+        self.assign(list(names), list(labels), columns)
+
+    def assign(self, names, labels, columns):
+        '''Set the attributes from the two vocabularies and the arrays of each column'''
+        self.names = Labels(names, columns['names'])
+        for column in ScanTable.strings[1:]:
+            setattr(self, column, Labels(labels, columns[column]))
+        for column in ScanTable.integers + ScanTable.floats:
+            setattr(self, column, columns[column])
+
+    def __len__(self):
+        return len(self.names)
+
+    def dump(self, f):
+        '''
+        Write the table to the binary file f: one JSON line holding the row count
+        and the two vocabularies, then the codes of each text column, the bounds
+        and the two score columns as raw machine arrays.
+        '''
+        f.write(json.dumps({'rows': len(self), 'names': self.names.vocabulary,
+                            'labels': self.types.vocabulary}).encode() + b'\n')
+        for column in ScanTable.typecodes:
+            values = getattr(self, column)
+            (values.codes if column in ScanTable.strings else values).tofile(f)
+
+    @classmethod
+    def read(cls, f):
+        '''Read a table written by dump from the binary file f'''
+        header = json.loads(f.readline())
+        columns = {}
+        for column, typecode in ScanTable.typecodes.items():
+            columns[column] = array(typecode)
+            columns[column].fromfile(f, header['rows'])
+        table = cls.__new__(cls)
+        table.assign(header['names'], header['labels'], columns)
+        return table
+
+    def nbytes(self):
+        '''Memory held by the table: the arrays of every column and the strings of both vocabularies'''
+        size = sum(sys.getsizeof(label) for label in self.names.vocabulary + self.types.vocabulary)
+        for column in ScanTable.typecodes:
+            values = getattr(self, column)
+            values = values.codes if column in ScanTable.strings else values
+            size += values.itemsize * len(values)
+        return size
+
+    def factorize(self, *columns):
+        '''
+        Integer codes of one or more Labels columns sharing a vocabulary (types,
+        anticodons, isotypes) as NumPy arrays, with that vocabulary. The columns
+        are already dictionary encoded, so the code arrays are used without copying.
+        '''
+        vocabulary = np.array(columns[0].vocabulary, dtype = str)
+        return vocabulary, [np.frombuffer(column.codes, dtype = column.codes.typecode) for column in columns]
+
+class ScanCache:
+    '''
+    Size-capped directory of binary ScanTable files, so repeat runs on the same
+    tRNAscan-SE output skip text parsing.
+
+    Each entry is keyed on the input's path and isotype column and records the
+    size, mtime and content hash of the file it was built from. An entry whose
+    size differs, or whose mtime differs and content hash no longer matches, is
+    stale and gets rebuilt. Entries are touched when read, and the least
+    recently used ones are removed once the folder grows past maxsize bytes.
+    '''
+
+    magic = b'chi-tRNA cache 3\n'
+
+    def __init__(self, folder, maxsize = 512 * 2**20):
+        self.folder = folder
+        self.maxsize = maxsize
+        os.makedirs(folder, exist_ok = True)
+
+    @staticmethod
+    def digest(fname):
+        '''Content hash of fname, read in 1 MB blocks'''
+        import hashlib
+        content = hashlib.blake2b(digest_size = 20)
+        with open(fname, 'rb') as f:
+            for block in iter(lambda: f.read(2**20), b''):
+                content.update(block)
+        return content.hexdigest()
+
+    def path(self, fname, mod):
+        '''Cache file for fname read with isotype column mod'''
+        import hashlib
+        key = hashlib.blake2b((os.path.abspath(fname) +'\t'+ str(mod)).encode(), digest_size = 16)
+        return os.path.join(self.folder, key.hexdigest() + '.chit')
+
+    def get(self, fname, mod):
+        '''Return the cached ScanTable of fname, or None when it is missing or stale'''
+        path = self.path(fname, mod)
+        try:
+            stat = os.stat(fname)
+            with open(path, 'rb') as f:
+                if f.readline() != ScanCache.magic:
+                    return None
+                line = f.readline()
+                header = json.loads(line)
+                if header['size'] != stat.st_size:
+                    return None
+                digest = header['digest']
+                if header['mtime'] != stat.st_mtime_ns: #touched or copied, check the content
+                    if ScanCache.digest(fname) != digest:
+                        return None
+                table = ScanTable.read(f)
+        except (OSError, ValueError, KeyError, EOFError):
+            return None
+        if header['mtime'] != stat.st_mtime_ns: #same content, record the new mtime
+            header['mtime'] = stat.st_mtime_ns
+            refreshed = json.dumps(header).encode() + b'\n'
+            if len(refreshed) == len(line): #rewrite the header line alone, the table stays
+                try:
+                    with open(path, 'r+b') as f:
+                        f.seek(len(ScanCache.magic))
+                        f.write(refreshed)
+                except OSError:
+                    pass
+            else: #mtime changed length, store the entry again
+                self.put(fname, mod, table, digest)
+        else:
+            os.utime(path)#mark as recently used
+        return table
+
+    def put(self, fname, mod, table, digest = None):
+        '''Store table as the cache entry of fname, then evict down to maxsize'''
+        stat = os.stat(fname)
+        header = {'size': stat.st_size, 'mtime': stat.st_mtime_ns,
+                  'digest': digest or ScanCache.digest(fname)}
+        import tempfile
+        path = self.path(fname, mod)
+        #written aside and renamed, so readers never see half a file; the name is
+        #unique per call, as server threads of one process may store the same entry
+        handle, temp = tempfile.mkstemp(dir = self.folder, prefix = os.path.basename(path) + '.', suffix = '.tmp')
+        try:
+            with os.fdopen(handle, 'wb') as f:
+                f.write(ScanCache.magic)
+                f.write(json.dumps(header).encode() + b'\n')
+                table.dump(f)
+            os.replace(temp, path)
+        except BaseException:
+            os.remove(temp)
+            raise
+        self.evict()
+
+    def evict(self):
+        '''Remove the least recently used entries until the folder fits in maxsize'''
+        entries = []
+        for name in os.listdir(self.folder):
+            if name.endswith('.chit'):
+                path = os.path.join(self.folder, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:#removed by another process
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, path))
+        entries.sort()
+        total = sum(size for mtime, size, path in entries)
+        for mtime, size, path in entries:
+            if total <= self.maxsize:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+class ChimeraWriter:
+    '''
+    Buffered writer of the supplemental report of chimeric tRNAs.
+
+    Rows are written as they are found, so memory stays bounded whatever the
+    number of chimeras. fmt 'tsv' writes a tab separated text report; 'bin'
+    writes a compact binary file of columnar blocks of up to block rows, each
+    a JSON line with the row count and the name and amino acid vocabularies
+    followed by raw code, bound and score arrays. read() gives the rows back.
+    '''
+
+    magic = b'chi-tRNA chimeras 1\n'
+    block = 65536
+    header = ('Sequence Name', 'tRNA Type', 'Isotype', 'Begin', 'End', 'Inf Score', 'Isotype Score')
+
+    def __init__(self, fname, fmt = 'tsv'):
+        self.fmt = fmt
+        self.rows = 0 #rows written so far
+        if fmt == 'tsv':
+            self.f = open(fname, 'w', buffering = 2**20)
+            self.f.write('\t'.join(ChimeraWriter.header) + '\n')
+            self.f.write('\t'.join('-' * len(title) for title in ChimeraWriter.header) + '\n')
+        elif fmt == 'bin':
+            self.f = open(fname, 'wb')
+            self.f.write(ChimeraWriter.magic)
+            self.pending = []
+        else:
+            raise ValueError('unknown report format ' + fmt)
+
+    def write(self, name, tRNA, isotype, begin, end, inf, iso):
+        '''Add one chimeric tRNA to the report'''
+        self.rows += 1
+        if self.fmt == 'tsv':
+            self.f.write('%s\t%s\t%s\t%d\t%d\t%g\t%g\n' % (name, tRNA, isotype, begin, end, inf, iso))
+        else:
+            self.pending.append((name, tRNA, isotype, begin, end, inf, iso))
+            if len(self.pending) == ChimeraWriter.block:
+                self.flush()
+
+    def flush(self):
+        '''Write the pending rows of the binary format as one columnar block'''
+        if self.fmt != 'bin' or not self.pending:
+            return
+        names = {}
+        labels = {} #tRNA types and isotypes share one vocabulary
+        columns = list(zip(*self.pending))
+        blocks = [array('I', [names.setdefault(name, len(names)) for name in columns[0]]),
+                  array('B', [labels.setdefault(label, len(labels)) for label in columns[1]]),
+                  array('B', [labels.setdefault(label, len(labels)) for label in columns[2]]),
+                  array('q', columns[3]), array('q', columns[4]),
+                  array('f', columns[5]), array('f', columns[6])]
+        self.f.write(json.dumps({'rows': len(self.pending), 'names': list(names), 'labels': list(labels)}).encode() + b'\n')
+        for block in blocks:
+            block.tofile(self.f)
+        self.pending = []
+
+    def close(self):
+        self.flush()
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *error):
+        self.close()
+
+    @staticmethod
+    def read(fname):
+        '''Yield the rows of a binary report written with fmt bin'''
+        with open(fname, 'rb') as f:
+            if f.readline() != ChimeraWriter.magic:
+                raise ValueError(fname + ' is not a chi-tRNA binary report')
+            for line in f:
+                header = json.loads(line)
+                rows = header['rows']
+                columns = []
+                for typecode in ('I', 'B', 'B', 'q', 'q', 'f', 'f'):
+                    values = array(typecode)
+                    values.fromfile(f, rows)
+                    columns.append(values)
+                names, labels = header['names'], header['labels']
+                for name, tRNA, isotype, begin, end, inf, iso in zip(*columns):
+                    yield names[name], labels[tRNA], labels[isotype], begin, end, inf, iso
+
+class Profile:
+    '''
+    Wall time, peak memory and counters of the stages of one run (--profile).
+
+    Stages are timed with perf_counter and their peak memory, the most Python
+    heap in use above what was in use when the stage started, is taken from
+    tracemalloc, which runs only while a Profile is alive. Stages may nest
+    (project loads the table the first time); the outer stage includes the inner.
+    tracemalloc slows down allocation heavy stages such as render, so their
+    times read high while profiling. counters holds row counts reported by
+    Module_Scanner.
+    '''
+
+    def __init__(self):
+        import tracemalloc
+        self.tracemalloc = tracemalloc
+        self.stages = {} #name: {'calls', 'seconds', 'peak_bytes'}
+        self.counters = Counter()
+        self.stack = [] #[running peak, memory at start] of each open stage
+        tracemalloc.start()
+
+    @contextmanager
+    def stage(self, name):
+        '''Time the body of the with statement as stage name'''
+        trace = self.tracemalloc
+        if self.stack: #keep the enclosing stage's peak before resetting it
+            self.stack[-1][0] = max(self.stack[-1][0], trace.get_traced_memory()[1])
+        trace.reset_peak()
+        entry = [0, trace.get_traced_memory()[0]]
+        self.stack.append(entry)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            self.stack.pop()
+            peak = max(entry[0], trace.get_traced_memory()[1]) - entry[1]
+            record = self.stages.setdefault(name, {'calls': 0, 'seconds': 0.0, 'peak_bytes': 0})
+            record['calls'] += 1
+            record['seconds'] += seconds
+            record['peak_bytes'] = max(record['peak_bytes'], peak)
+
+    def stop(self):
+        self.tracemalloc.stop()
+
+    def summary(self):
+        '''Human readable table of the stages and counters'''
+        lines = ['Stage\tSeconds\tPeak MB']
+        for name, record in self.stages.items():
+            lines.append('%s\t%.4f\t%.1f' % (name, record['seconds'], record['peak_bytes'] / 2**20))
+        lines.append('Counter\tValue')
+        for name, value in self.counters.items():
+            lines.append(name +'\t'+ str(value))
+        return '\n'.join(lines)
+
+    def save(self, fname):
+        '''Write the stages and counters to fname as JSON'''
+        with open(fname, 'w') as f:
+            json.dump({'stages': self.stages, 'counters': self.counters}, f, indent = 1)
+
 class Module_Scanner:
     '''
     From command line
@@ -129,147 +725,160 @@ class Module_Scanner:
     'NNN': 65
     }
 
-    def __init__(self, fname, user_value, option, title, mod, sup, filt):
-        '''Initializes objects'''
+    #expected isotype (aa_numeric) of each AntiNumeric code 1-65; codes 1-63 are the
+    #step-wise "normal line" of the anticodon graph, 64 is the stop/Sup and 65 Undet
+    anticodon_isotype = [1,1,1,1,2,2,2,2,2,2,3,3,4,4,5,5,6,6,7,7,8,8,8,8,9,9,10,10,10,
+        11,11,11,11,11,11,12,12,13,14,14,15,15,15,15,16,16,16,16,16,16,17,17,17,17,
+        18,19,19,20,20,20,20,21,22,25,24]
+
+    def __init__(self, fname, user_value, option, title, mod, sup, filt, vector=None, cache=None, profile=None):
+        '''
+        Initializes objects, vector selects the NumPy path (default: when numpy
+        is installed), cache is an optional ScanCache used by load() and profile
+        an optional Profile that times each stage
+        '''
         self.fname = fname
         self.user_value = user_value
         self.option = option
         self.title = title
-        self.mod = mod
+        self.mod = mod #isotype column, None to find it from the header
+        self.schema = None #set by parser() and rows()
         self.sup = sup
         self.filt = filt
+        self.vector = np is not None if vector is None else vector
+        self.cache = cache
+        self.profile = profile
+        self.counters = Counter() #rows read, passed, dropped, unknown codes, chimeric
+        self.table = None #filled in once by load()
+        self.points = None #filled in once by project()
+
+    def stage(self, name):
+        '''Context timing one stage when profiling, otherwise it does nothing'''
+        if self.profile is None:
+            return nullcontext()
+        return self.profile.stage(name)
 
     def parser(self):
-        '''Take tRNAscan-SE data and append each line to list data'''
-        data = []
-        with open(self.fname) as f:
-            line = f.readline()
+        '''
+        Take tRNAscan-SE data (plain or compressed), find its columns from the
+        header (Schema) and return the needed fields of each line as tuples
+        '''
+        with open_scan(self.fname) as f:
+            self.schema = Schema.read(f, self.mod, self.filt)
+            project = self.schema.projection()
+            rows = [project(line) for line in f if 1 < len(line)] #skip blank lines
+        if not rows and not self.schema.known:
+            raise ValueError(self.fname + ' is not a tRNAscan-SE output: no tRNAs and no header')
+        return rows
+
+    def rows(self):
+        '''
+        Yield the rows of the tRNAscan-SE file one at a time, projected like
+        parser() does. Nothing is kept in memory.
+        '''
+        with open_scan(self.fname) as f:
+            self.schema = Schema.read(f, self.mod, self.filt)
+            project = self.schema.projection()
+            rows = 0
             for line in f:
-                listit = line.replace('\n','').split('\t') #generates a list at
-                #each tab after remove all \n in the tRNAscan-SE output data.
-                data.append(listit)#adds lists to data, making data a list of lists.
-            data = data[2:] #makes index entry 2 onward the list for data to
-            #remove the titles for each column.
-            return data
+                if 1 < len(line):
+                    rows += 1
+                    yield project(line)
+        if not rows and not self.schema.known:
+            raise ValueError(self.fname + ' is not a tRNAscan-SE output: no tRNAs and no header')
+
+    def load(self):
+        '''
+        Parse the tRNAscan-SE file once and keep the columnar ScanTable.
+        Every later call returns the same table without touching the file.
+        With a cache the table is read from its binary cache entry when valid.
+        '''
+        if self.table is None and self.cache is not None:
+            with self.stage('cache'):
+                self.table = self.cache.get(self.fname, self.mod)
+            if self.table is None: #missing or stale, parse and store it
+                with self.stage('parse'):
+                    self.table = ScanTable(self.rows())
+                self.cache.put(self.fname, self.mod, self.table)
+        if self.table is None:
+            with self.stage('parse'):
+                self.table = ScanTable(self.rows())
+        self.counters['rows'] = len(self.table)
+        return self.table
 
     def tRNA_type(self):
-        '''Take list from function parser and extract tRNA type and convert it
+        '''Take the tRNA type column from load() and convert it
         to a numeric value from dictionary aa_numeric'''
         if self.option == 'aa':
-            data = self.parser() #calls function parser and stores the output as list data
-            transfer = []
-            tRNA = [] #stores the tRNA amino acid type
-            xtRNA = [] #list that stores the tRNA amino acids as numeric values
-            while 0 < len(data): #while the length of list data is greater than 0
-                transfer.append(data[0])#take the 0th index and append it to list transfer
-                analyze = [entry[4] for entry in transfer]#within in list transfer, look at the list (index 0 that was appended to transfer) and save the 4th index to name analyze
-                tRNA.append(analyze)# append analyze to list tRNA
-                transfer.pop(0)#pop the 0th index in list transfer to make it empty
-                data.pop(0)#pop the 0th index in list data to make index 1 the new index 0
-            if 0 == len(data): #once length of list data is zero
-                tRNA = [val for sublist in tRNA for val in sublist] #flatten nested list
-            for amino_acid in tRNA: #for each amino acid in list tRNA
-                xtRNA.append(Module_Scanner.aa_numeric[amino_acid])#find the numeric value for the amino acid in dictionary aa_numeric, and append it to xtRNA
+            tRNA = self.load().types #stores the tRNA amino acid type
+            xtRNA = [Module_Scanner.aa_numeric[amino_acid] for amino_acid in tRNA]#find the numeric value for each amino acid in dictionary aa_numeric
             return xtRNA
 
     def antiCodon_type(self):
-        '''Take list from function parser and extract tRNA type and convert it
-            to a numeric value from dictionary aa_numeric'''
+        '''Take the anticodon column from load() and convert it
+            to a numeric value from dictionary AntiNumeric'''
         if self.option == 'anticodon':
-            data = self.parser() #calls function parser and stores the output as list data
-            transfer = []
-            antiCodon = [] #stores the Anticodon type
-            xtRNA = [] #list that stores the tRNA amino acids as numeric values
-            while 0 < len(data): #while the length of list data is greater than 0
-                transfer.append(data[0])#take the 0th index and append it to list transfer
-                analyze = [entry[5] for entry in transfer]#within in list transfer, look at the list (index 0 that was appended to transfer) and save the 5th index to name analyze
-                antiCodon.append(analyze)# append analyze to list tRNA
-                transfer.pop(0)#pop the 0th index in list transfer to make it empty
-                data.pop(0)#pop the 0th index in list data to make index 1 the new index 0
-            if 0 == len(data): #once length of list data is zero
-                antiCodon = [val for sublist in antiCodon for val in sublist] #flatten nested list
-            for amino_acid in antiCodon: #for each amino acid in list antiCodon
-                xtRNA.append(Module_Scanner.AntiNumeric[amino_acid])#find the numeric value for the amino acid in dictionary AntiNumeric, and append it to xtRNA
+            antiCodon = self.load().anticodons #stores the Anticodon type
+            xtRNA = [Module_Scanner.AntiNumeric[amino_acid] for amino_acid in antiCodon]#find the numeric value for each anticodon in dictionary AntiNumeric
             return xtRNA
 
     def isoType(self):
         '''
-        Take list from function parser and extract isotype data and convert it
+        Take the isotype column from load() and convert it
         to a numeric value from dictionary aa_numeric
         '''
-        data = self.parser() #calls function parser and stores the output as list data
-        transfer = []
-        isotype = [] #stores the tRNA isotype
-        yisotype = [] #list that stores the tRNA isotype as numeric values
-        while 0 < len(data): #while the length of list data is greater than 0
-            transfer.append(data[0]) #take the 0th index and append it to list transfer
-            analyze = [entry[self.mod] for entry in transfer] #within in list transfer, look at the list (index 0 that was appended to transfer) and save the 4th index to name analyze
-            isotype.append(analyze)# append analyze to list isotype
-            transfer.pop(0)#pop the 0th index in list transfer to make it empty
-            data.pop(0)#pop the 0th index in list data to make index 1 the new index 0
-        if 0 == len(data): #once length of list data is zero
-            isotype = [val for sublist in isotype for val in sublist]
-        for amino_acid in isotype: #for each amino acid in list isotype
-            yisotype.append(Module_Scanner.aa_numeric[amino_acid]) #find the numeric value for the amino acid in dictionary aa_numeric, and append it to yisotype
+        isotype = self.load().isotypes #stores the tRNA isotype
+        yisotype = [Module_Scanner.aa_numeric[amino_acid] for amino_acid in isotype] #find the numeric value for each amino acid in dictionary aa_numeric
         return yisotype
 
+    def chimeras(self):
+        '''
+        Return the row numbers of the table whose tRNA type and isotype do not
+        match, leaving out isotypes called iMet or fMet.
+        '''
+        table = self.load()
+        with self.stage('chimeras'):
+            if self.vector: #integer codes over one vocabulary, compared as arrays
+                vocabulary, (types, isotypes) = table.factorize(table.types, table.isotypes)
+                initiator = np.isin(vocabulary, ('iMet', 'fMet'))
+                mismatch = (types != isotypes) & ~initiator[isotypes]
+                rows = np.flatnonzero(mismatch).tolist()
+            else: #the same test on the codes of the shared vocabulary
+                initiator = {code for code, label in enumerate(table.isotypes.vocabulary) if label in ('iMet', 'fMet')}
+                rows = [row for row, (tRNA, isotype) in enumerate(zip(table.types.codes, table.isotypes.codes))
+                        if tRNA != isotype and isotype not in initiator]
+        self.counters['chimeric'] = len(rows)
+        return rows
+
     def analysis(self):
         '''
         Compare the tRNA type and isotype and output them as a smaller string
         if they are not the same
         '''
         if self.sup == 'y':
-            data = self.parser() #take output list from parser function and set it to name data
-            transfer = [] #used as temporary container for the list within the larger list of data
-            analysis = ''
-            while 0 < len(data): #as long as the length of data is larger than 0
-                scan = (data[0])#grab the 0th index from the list
-                if scan[4] != scan[self.mod]: #if indexes do not match
-                    if scan[self.mod] == 'iMet':#and making sure that index value is not iMet
-                        pass
-                    elif scan[self.mod] == 'fMet':#and that it is not fMet
-                        pass
-                    else:
-                        analysis += scan[0] +'\t'+ scan[4] +'\t\t'+ scan[self.mod] +'\n' #add the indecies to analysis
-                        scan = ''#empties scan
-                        data.pop(0)#pops 0th index making 1st index the new 0th
-            return analysis#returns the strings
+            table = self.load()
+            return ''.join(table.names[row] +'\t'+ table.types[row] +'\t\t'+ table.isotypes[row] +'\n'
+                           for row in self.chimeras()) #rows where type and isotype disagree
+
+    def export(self, writer):
+        '''Write every chimeric tRNA of the table to a ChimeraWriter'''
+        table = self.load()
+        for row in self.chimeras():
+            writer.write(table.names[row], table.types[row], table.isotypes[row], table.begins[row],
+                         table.ends[row], table.inf_scores[row], table.iso_scores[row])
 
     def grab_numbers(self):
         '''
         Create list of Scores
         '''
         if self.filt == 'inf':
-            data = self.parser()#set function parser output to data
-            transfer = []#empty lists used for transfering contents
-            inf_score = []
-            inf_scores = []
-            while 0 < len(data): #while lenght of list data is larger than 0
-                transfer.append(data[0]) #take the 0th item and append it to transfer generating a list of lists
-                analyze = [entry[8] for entry in transfer] #for the list within list transfer grab the 8th index and save it to name analyze
-                inf_score.append(analyze) #append analyze to list inf_score
-                transfer.pop(0)# pop 0th index in lists data and transfer
-                data.pop(0)
-            if 0 == len(data): #once the length of data is equal to 0
-                inf_score = [val for sublist in inf_score for val in sublist] #flatten the list of lists
-                inf_scores = [float(i) for i in inf_score] #for each entry in list inf_score convert the string values to intgers.
-            return inf_scores
+            return self.load().inf_scores #array of floats, converted once by load
 
         elif self.filt == 'iso':
-            data = self.parser()#set function parser output to data
-            transfer = []#empty lists used for transfering contents
-            inf_score = []
-            inf_scores = []
-            while 0 < len(data): #while lenght of list data is larger than 0
-                transfer.append(data[0]) #take the 0th item and append it to transfer generating a list of lists
-                analyze = [entry[-1] for entry in transfer] #for the list within list transfer grab the 8th index and save it to name analyze
-                inf_score.append(analyze) #append analyze to list inf_score
-                transfer.pop(0)# pop 0th index in lists data and transfer
-                data.pop(0)
-            if 0 == len(data): #once the length of data is equal to 0
-                inf_score = [val for sublist in inf_score for val in sublist] #flatten the list of lists
-                inf_scores = [float(i) for i in inf_score] #for each entry in list inf_score convert the string values to intgers.
-            return inf_scores
+            scores = self.load().iso_scores #isotype scores, nan when the file has none
+            if len(scores) and all(score != score for score in scores): #e.g. a cached table of a file without them
+                raise ValueError('no Isotype Score column in ' + self.fname + '; it is needed by -f iso')
+            return scores
 
     def restrictions(self):
         '''Fetch values from functions grab_numbers, isoType, and tRNA_type and zip them'''
@@ -288,138 +897,908 @@ class Module_Scanner:
         (the Inf score from input file) and determine if the value is equal to
         or greater than the user's cut off value.
         '''
-        data = self.restrictions() #set output from restrictions to data
-        transfer = [] #empty container used for transfering data
-        plot = [] #will become a list of lists containing points that will be plotted
-        while 0 < len(data):#while the length of data is greater than 0
-            transfer.append(data[0])#append the 0th element to transfer
-            analyze = [entry[2] for entry in transfer] #take the 2nd element in the list within list transfer
-            if self.user_value <= analyze[0]:# if the vaule is greater than or equal to the users value
-                plot.append(data[0])#append it to plot
-            transfer.pop(0)# pop the 0th index in transfer and data.
-            data.pop(0)
-        return plot #returns
+        return [entry for entry in self.restrictions() if self.user_value <= entry[2]]
+
+    def project(self):
+        '''
+        Select the X-axis column (tRNA type or anticodon), the isotype column
+        and the score column chosen with -f from the table, keep the rows at or
+        above the user's cut off and encode them as numeric x and y lists.
+        Rows with a type, anticodon or isotype missing from aa_numeric or
+        AntiNumeric are dropped and counted as unknown codes.
+        Done in one pass over the table; the result is kept for xtRNA and yisoType.
+        '''
+        if self.points is None and self.vector:
+            self.points = self.project_vector()
+        if self.points is None:
+            table = self.load()
+            if self.option == 'aa':
+                column, xcode = table.types, Module_Scanner.aa_numeric
+            elif self.option == 'anticodon':
+                column, xcode = table.anticodons, Module_Scanner.AntiNumeric
+            xlookup = [xcode.get(label) for label in column.vocabulary] #numeric value of each code
+            ylookup = [Module_Scanner.aa_numeric.get(label) for label in table.isotypes.vocabulary]
+            cut = self.user_value
+            x = [] #tRNA type or anticodon as numeric values
+            y = [] #isotype as numeric values
+            unknown = 0
+            with self.stage('filter'): #encoding is part of the same pass here
+                for tRNA, isotype, score in zip(column.codes, table.isotypes.codes, self.grab_numbers()):
+                    if cut <= score: #same cut off test as plot_filter
+                        xvalue = xlookup[tRNA]
+                        yvalue = ylookup[isotype]
+                        if xvalue is None or yvalue is None:
+                            unknown += 1
+                        else:
+                            x.append(xvalue)
+                            y.append(yvalue)
+            self.count_points(len(x), unknown)
+            self.points = (x, y)
+        return self.points
+
+    def count_points(self, passed, unknown):
+        '''Record how many rows passed, fell below the cut off or had unknown codes'''
+        self.counters['passed'] = passed
+        self.counters['unknown codes'] = unknown
+        self.counters['below cut off'] = self.counters['rows'] - passed - unknown
+
+    @staticmethod
+    def lookup(vocabulary, numeric):
+        '''Precompute the numeric value of every vocabulary entry, 0 when it is not in numeric'''
+        return np.array([numeric.get(label, 0) for label in vocabulary])
+
+    def project_vector(self):
+        '''
+        NumPy version of project. The integer codes of the columns are mapped
+        through lookup tables built once per distinct label, and the score
+        cut off is applied as a boolean mask. Returns numpy arrays x and y.
+        '''
+        table = self.load()
+        if self.option == 'aa':
+            column, xcode = table.types, Module_Scanner.aa_numeric
+        elif self.option == 'anticodon':
+            column, xcode = table.anticodons, Module_Scanner.AntiNumeric
+        with self.stage('encode'):
+            xvocabulary, (xindex,) = table.factorize(column)
+            yvocabulary, (yindex,) = table.factorize(table.isotypes)
+            x = Module_Scanner.lookup(xvocabulary, xcode)[xindex]
+            y = Module_Scanner.lookup(yvocabulary, Module_Scanner.aa_numeric)[yindex]
+        with self.stage('filter'):
+            keep = self.user_value <= np.frombuffer(self.grab_numbers())
+            known = (x != 0) & (y != 0) #0 is the lookup value of unknown codes
+            unknown = int(np.count_nonzero(keep & ~known))
+            keep &= known
+            x = x[keep]
+            y = y[keep]
+        self.count_points(len(x), unknown)
+        return x, y
+
+    def stream(self, chimera = None):
+        '''
+        Streaming counterpart of project and chimeras for files too large to hold
+        in memory. Rows come from rows(), are filtered by the score cut off and
+        encoded as they arrive, and are folded into a Counter of (x, y) points,
+        which is returned. If chimera is given it is called with (sequence name,
+        tRNA type, isotype, begin, end, Inf score, isotype score) for every
+        mismatching row as it is read, e.g. ChimeraWriter.write.
+        Memory use is the size of the Counter, whatever the size of the file.
+        Rows with unknown codes are skipped and counted, as in project.
+        '''
+        counts = Counter()
+        with self.stage('stream'):
+            self.fold(self.rows(), counts, chimera)
+        return counts
+
+    def fold(self, entries, counts, chimera = None):
+        '''
+        Add projected rows (see Schema.projection) to counts and to the counters,
+        calling chimera for the mismatching ones; shared by stream and follow.
+        '''
+        if self.option == 'aa':
+            column, xcode = 3, Module_Scanner.aa_numeric
+        elif self.option == 'anticodon':
+            column, xcode = 4, Module_Scanner.AntiNumeric
+        ycode = Module_Scanner.aa_numeric
+        score = 6 if self.filt == 'inf' else 7 #Inf score or isotype score
+        cut = self.user_value
+        rows = passed = unknown = chimeric = 0
+        for entry in entries:
+            rows += 1
+            tRNA, isotype = entry[3], entry[5]
+            if tRNA != isotype and isotype not in ('iMet', 'fMet'):
+                chimeric += 1
+                if chimera is not None:
+                    chimera(entry[0], tRNA, isotype, int(entry[1]), int(entry[2]),
+                            float(entry[6]), float(entry[7]))
+            if cut <= float(entry[score]):
+                xvalue = xcode.get(entry[column])
+                yvalue = ycode.get(isotype)
+                if xvalue is None or yvalue is None:
+                    unknown += 1
+                else:
+                    counts[(xvalue, yvalue)] += 1
+                    passed += 1
+        self.counters['rows'] += rows
+        self.counters['chimeric'] += chimeric
+        self.counters['passed'] += passed
+        self.counters['unknown codes'] += unknown
+        self.counters['below cut off'] += rows - passed - unknown
+
+    def follow(self, update, interval = 5.0, idle = None, chimera = None, restart = None):
+        '''
+        Follow a tRNAscan-SE output that is still being written. Every interval
+        seconds the rows appended since the last look are read, a line that is
+        not finished yet is held back, and the new rows are folded into the
+        running counts (and passed to chimera, as in stream). update(counts) is
+        called after every look that found new rows, so each update costs only
+        the new rows. If the file shrinks it was restarted and is read again
+        from the top; restart() is called first, so rows already passed to
+        chimera can be dropped. Stops after idle seconds without new rows, or
+        never when idle is None. Returns the final counts.
+        '''
+        counts = Counter()
+        titles = [] #header lines, the Schema is read from them once all three are in
+        project = None
+        partial = b''
+        quiet = 0.0
+        block = 2**20 #bytes read at a time, so memory stays bounded however much is already written
+        with open(self.fname, 'rb') as f: #binary, so tell() is a byte offset to compare with the size
+            while True:
+                if os.fstat(f.fileno()).st_size < f.tell(): #truncated, start over
+                    f.seek(0)
+                    counts.clear()
+                    self.counters.clear()
+                    titles, project, partial = [], None, b''
+                    if restart is not None:
+                        restart()
+                data = f.read(block)
+                finished = idle is not None and idle <= quiet
+                if finished and partial and len(data) < block: #the file ended without a final newline
+                    data += b'\n'
+                if data:
+                    lines = (partial + data).split(b'\n')
+                    partial = lines.pop()
+                    lines = [line.decode() for line in lines] #whole lines, so no character is split
+                    while project is None and lines:
+                        titles.append(lines.pop(0).rstrip('\r').split('\t'))
+                        if len(titles) == 3:
+                            self.schema = Schema(titles, self.mod, self.filt)
+                            project = self.schema.projection()
+                    if project is not None:
+                        self.fold((project(line) for line in lines if line), counts, chimera)
+                    if len(data) == block: #more is already written, read on before updating
+                        continue
+                    update(counts)
+                    quiet = 0.0
+                elif finished:
+                    return counts
+                time.sleep(interval)
+                quiet += interval
+
+    def sweep(self, thresholds):
+        '''
+        Count, for every cut off in thresholds, how many tRNAs pass and how many
+        of those are chimeric (the chimeras criterion), overall and per X-axis
+        group (amino acid or anticodon). The score column follows -f. Scores are
+        sorted once per group and every cut off is a binary search, so a long
+        sweep costs about as much as one run. Rows with unknown codes are left
+        out, as in project, so passed matches a single run at the same cut off.
+        Returns rows of (cut off, group, passed, chimeric), group 'All' first.
+        '''
+        from bisect import bisect_left
+        table = self.load()
+        if self.option == 'aa':
+            column, xcode = table.types, Module_Scanner.aa_numeric
+        elif self.option == 'anticodon':
+            column, xcode = table.anticodons, Module_Scanner.AntiNumeric
+        xknown = [label in xcode for label in column.vocabulary] #same lookup as project, per code
+        yknown = [label in Module_Scanner.aa_numeric for label in table.isotypes.vocabulary]
+        known = [xknown[x] and yknown[y] for x, y in zip(column.codes, table.isotypes.codes)]
+        scores = self.grab_numbers()
+        passed = {'All': []} #group: scores of its tRNAs
+        chimeric = {'All': []} #group: scores of its chimeric tRNAs
+        for row in self.chimeras():
+            if known[row]:
+                chimeric['All'].append(scores[row])
+                chimeric.setdefault(column[row], []).append(scores[row])
+        for group, score, usable in zip(column, scores, known):
+            if usable:
+                passed['All'].append(score)
+                passed.setdefault(group, []).append(score)
+        groups = ['All'] + sorted(group for group in passed if group != 'All')
+        for group in groups:
+            passed[group].sort()
+            chimeric.setdefault(group, []).sort()
+        sweep = []
+        for cut in thresholds: #scores at or above cut pass, as in project
+            for group in groups:
+                above = len(passed[group]) - bisect_left(passed[group], cut)
+                mismatched = len(chimeric[group]) - bisect_left(chimeric[group], cut)
+                sweep.append((cut, group, above, mismatched))
+        return sweep
+
+    def expected(self, x):
+        '''Isotype code a tRNA with X-axis code x should have (the normal line)'''
+        if self.option == 'anticodon':
+            return Module_Scanner.anticodon_isotype[x - 1]
+        return x
+
+    def normal(self, x, y):
+        '''
+        True when the cell (x, y) lies on the normal line, judged as chimeras()
+        judges a tRNA: the isotype is the one expected from x, or, for the CAT
+        anticodon, which tRNAscan-SE types Met or Ile2, it is Ile2. iMet and
+        fMet isotypes share Met's code, so a cell cannot exempt them the way
+        chimeras() does; they count as Met.
+        '''
+        if self.option == 'anticodon' and x == Module_Scanner.AntiNumeric['CAT'] and y == Module_Scanner.aa_numeric['Ile2']:
+            return True
+        return y == self.expected(x)
+
+    @staticmethod
+    def label(code, numeric):
+        '''Name of a numeric code; the first name in numeric wins, so 13 is Met not iMet'''
+        for name, value in numeric.items():
+            if value == code:
+                return name
 
     def xtRNA(self):
         '''
-        Grab the tRNA type numeric vaule from the list of tuples that made the
-        cut off done in plot_filter.
-        '''
-        data = self.plot_filter()
-        transfer = []
-        xtRNA = []
-        while 0 < len(data):
-            transfer.append(data[0])
-            analyze = [entry[0] for entry in transfer]
-            xtRNA.append(analyze)
-            transfer.pop(0)
-            data.pop(0)
-        if 0 == len(data): #once length of list data is zero
-            xtRNA = [val for sublist in xtRNA for val in sublist] #flatten nested list
-        return xtRNA
+        Grab the tRNA type numeric vaule of the points that made the
+        cut off done in project.
+        '''
+        return self.project()[0]
 
     def yisoType(self):
         '''
-        Grab the yisotype numeric value from the list of tuples that made the
-        cut off done in plot_filter
-        '''
-        data = self.plot_filter()
-        transfer = []
-        yisotype = []
-        while 0 < len(data):
-            transfer.append(data[0])
-            analyze = [entry[1] for entry in transfer]
-            yisotype.append(analyze)
-            transfer.pop(0)
-            data.pop(0)
-        if 0 == len(data):
-            yisotype = [val for sublist in yisotype for val in sublist]
-        return yisotype
+        Grab the yisotype numeric value of the points that made the
+        cut off done in project
+        '''
+        return self.project()[1]
 
-    def plot(self):
+    def counts(self):
+        '''
+        Collapse the points from project into a Counter of (x, y) cells of the
+        tRNA type or anticodon by isotype grid, so each cell is drawn once.
+        '''
+        x, y = self.project()
+        if self.vector:
+            cells, number = np.unique(np.column_stack((x, y)).reshape(-1, 2), axis = 0, return_counts = True)
+            return Counter(dict(zip(map(tuple, cells.tolist()), number.tolist())))
+        return Counter(zip(x, y))
+
+    def plot(self, render = 'density', counts = None, output = None):
         '''
         Fetch numeric data from functions tRNA_type and isoType. Plot points
         on a 2D plane.
+
+        render chooses how the points are drawn:
+        points: one green dot and one faint magenta disc per tRNA
+        density: one dot and disc per cell, the disc as opaque as the stacked
+        discs of points would be, so the figure looks the same at a cost set by
+        the grid rather than the number of tRNAs
+        bubble: one disc per cell, sized and coloured by its count
+        heatmap: the count matrix drawn as coloured cells
+        Every mode except points can be given precomputed counts (from stream).
+        With output the figure is saved there (PNG, SVG or PDF by extension) on
+        the Agg backend instead of being shown; every call reuses one figure.
         '''
+        if render == 'points':
+            self.project()
+        elif counts is None:
+            counts = self.counts()
+        with self.stage('render'):
+            self.draw(render, counts, output)
+
+    def draw(self, render, counts, output):
+        '''Draw the figure for plot'''
+        plt = pyplot(output is not None)
         plt.rc('font', size = 14)
-        x = self.xtRNA() #points that will be plotted for the x axis
-        y = self.yisoType() #points that will be plotted for the y axis
-        if self.option == 'aa':
-            x2 = [1,2,3,4,5,6,7,8,9,10,11,12,13,14,15,16,17,18,19,20,21,22]
-            y2 = [1,2,3,4,5,6,7,8,9,10,11,12,13,14,15,16,17,18,19,20,21,22]
-            #x2 and y2 are used for the "normal line"
-            x3 = [1,2,3,4,5,6,7,8,9,10,11,12,13,14,15,16,17,18,19,20,21,22,23,24,25]
-            y3 = [1,2,3,4,5,6,7,8,9,10,11,12,13,14,15,16,17,18,19,20,21,22,23]
-            #x3 and y3 are used for labeling the X and Y axis as amino acids in
-            #conjunciton with labelx and labely
-            labelx = ['Ala','Arg','Asn','Asp','Cys',
-                'Gln', 'Glu', 'Gly','His', 'Ile',
-                'Leu','Lys','Met','Phe', 'Pro',
-                'Ser','Thr','Trp','Tyr', 'Val',
-                'SeC', 'Pyl','Ile2', 'Undet',
-                'Sup']
-            labely = ['Ala','Arg','Asn','Asp','Cys',
-                'Gln', 'Glu', 'Gly','His', 'Ile',
-                'Leu','Lys','Met','Phe', 'Pro',
-                'Ser','Thr','Trp','Tyr', 'Val',
-                'SeC', 'Pyl', 'Ile2']
-            plt.plot(x2,y2)#generatees "normal line"
-        elif self.option =='anticodon':
-             #Ala 1-4, Arg 5-10, Asn 11-12, Asp 13-14, Cys 15-16, Gln 17-18, Glu 19-20, Gly 21-24
-             #His 25-26, Ile 27-29, leu 30-35, lys 36-37, Met 38, phe, 39-40, Pro 41-44, Ser 45-50
-             #Thr 51- 54, Trp 55, Tyr 56-57, Val 58-61, SeC 62, Pyl 63,
-            x3 = [1,2,3,4,5,6,7,8,9,10,11,12,13,14,15,16,17,18,19,20,21,22,23,24,25,26,27,28,
-                29,30,31,32,33,34,35,36,37,38,39,40,41,42,43,44,45,46,47
-                ,48,49,50,51,52,53,54,55,56,57,58,59,60,61,62,63,64,65]
-            y3 = [1,2,3,4,5,6,7,8,9,10,11,12,13,14,15,16,17,18,19,20,21,22,23]
-
-            #x3 and y3 are used for labeling the X and Y axis as amino acids in
-            #conjunciton with labelx and labely
-
-            x4 = [1,2,3,4,5,6,7,8,9,10,11,12,13,14,15,16,17,18,19,20,21,22,23,24,25,26,27,28,
-                29,30,31,32,33,34,35,36,37,38,39,40,41,42,43,44,45,46,47
-                ,48,49,50,51,52,53,54,55,56,57,58,59,60,61,62,63]
-
-            y4 = [1,1,1,1,2,2,2,2,2,2,3,3,4,4,5,5,6,6,7,7,8,8,8,8,9,9,10,10,10,
-            11,11,11,11,11,11,12,12,13,14,14,15,15,15,15,16,16,16,16,16,16,17,17,17,17,
-            18,19,19,20,20,20,20,21,22]
-
-            #x4 and y4 are used to generate a "normal line" in the form of a
-            #step-wise function showing the expected isotype in regards to the
-            #anticodon Sequence
-
-            labelx = ['AGC', 'GGC', 'UGC', 'CGC', 'ACG', 'GCG', 'UCG',
-                    'CCG', 'UCU', 'CCU', 'AUU', 'GUU', 'AUC', 'GUC',
-                    'ACA', 'GCA', 'UUG', 'CUG', 'UUC', 'CUC', 'ACC', 'GCC',
-                    'UCC', 'CCC', 'AUG', 'GUG', 'AAU', 'GAU', 'UAU', 'UAA',
-                    'CAA', 'AAG', 'GAG', 'UAG', 'CAG', 'UUU', 'CUU', 'CAU',
-                    'AAA', 'GAA', 'AGG', 'GGG', 'UGG', 'CGG', 'AGA', 'GGA',
-                    'UGA', 'CGA', 'ACU', 'GCU', 'AGU', 'GGU', 'UGU', 'CGU',
-                    'CCA', 'AUA', 'GUA', 'AAC', 'GAC', 'UAC', 'CAC', 'UCA',
-                    'CUA', 'UUA', 'NNN']
-
-            labely = ['Ala','Arg','Asn','Asp','Cys',
+        plt.figure('chi-tRNA', clear = True)
+        axes = plt.gca()
+        shape = draw_frame(axes, self.option)
+        axes.set_title(self.title)#title of graph is global name fname
+        if render == 'points':
+            x = self.xtRNA() #points that will be plotted for the x axis
+            y = self.yisoType() #points that will be plotted for the y axis
+            axes.scatter(x,y, color = 'green') #generates data points using values from names x and y
+            #accoidates for low frequency of apperances.
+            axes.scatter (x,y, alpha=.1, s = 400, color = 'm' ) #generates data points
+            #using data from names x and y. Each point is transparent and becomes
+            #more visible as points overlap. Selected color is magenta.
+        else:
+            draw_marks(axes, render, counts, shape)
+        if output is None:
+            plt.show()
+        else:
+            plt.savefig(output, bbox_inches = 'tight')
+
+def draw_frame(axes, option):
+    '''
+    Draw the parts of a chi-tRNA figure that do not depend on the data on
+    matplotlib axes: the "normal line", axis labels, amino acid and anticodon
+    tick labels and the grid. Returns the number of (X, Y) ticks.
+    '''
+    if option == 'aa':
+        x2 = [1,2,3,4,5,6,7,8,9,10,11,12,13,14,15,16,17,18,19,20,21,22]
+        y2 = [1,2,3,4,5,6,7,8,9,10,11,12,13,14,15,16,17,18,19,20,21,22]
+        #x2 and y2 are used for the "normal line"
+        x3 = [1,2,3,4,5,6,7,8,9,10,11,12,13,14,15,16,17,18,19,20,21,22,23,24,25]
+        y3 = [1,2,3,4,5,6,7,8,9,10,11,12,13,14,15,16,17,18,19,20,21,22,23]
+        #x3 and y3 are used for labeling the X and Y axis as amino acids in
+        #conjunciton with labelx and labely
+        labelx = ['Ala','Arg','Asn','Asp','Cys',
+            'Gln', 'Glu', 'Gly','His', 'Ile',
+            'Leu','Lys','Met','Phe', 'Pro',
+            'Ser','Thr','Trp','Tyr', 'Val',
+            'SeC', 'Pyl','Ile2', 'Undet',
+            'Sup']
+        labely = ['Ala','Arg','Asn','Asp','Cys',
             'Gln', 'Glu', 'Gly','His', 'Ile',
             'Leu','Lys','Met','Phe', 'Pro',
             'Ser','Thr','Trp','Tyr', 'Val',
             'SeC', 'Pyl', 'Ile2']
-            plt.xticks(x, labelx, rotation='vertical')
-            #names used for x and y axis
-            plt.step(x4,y4, lw = 2)
-        plt.xlabel('Anticodon')
-        plt.ylabel('Isotype')
-        plt.title(self.title)#title of graph is global name fname
-        plt.xticks(x3, labelx)
-        plt.yticks(y3, labely)
-        #labels the x and y axis' as amino acids.
-        plt.scatter(x,y, color = 'green') #generates data points using values from names x and y
-        #accoidates for low frequency of apperances.
-        plt.scatter (x,y, alpha=.1, s = 400, color = 'm' ) #generates data points
-        #using data from names x and y. Each point is transparent and becomes
-        #more visible as points overlap. Selected color is magenta.
-        plt.grid(b = True, which = 'major', linestyle = '-' ) #creates darker
-        #grid lines
+        axes.plot(x2,y2)#generatees "normal line"
+    elif option =='anticodon':
+         #Ala 1-4, Arg 5-10, Asn 11-12, Asp 13-14, Cys 15-16, Gln 17-18, Glu 19-20, Gly 21-24
+         #His 25-26, Ile 27-29, leu 30-35, lys 36-37, Met 38, phe, 39-40, Pro 41-44, Ser 45-50
+         #Thr 51- 54, Trp 55, Tyr 56-57, Val 58-61, SeC 62, Pyl 63,
+        x3 = [1,2,3,4,5,6,7,8,9,10,11,12,13,14,15,16,17,18,19,20,21,22,23,24,25,26,27,28,
+            29,30,31,32,33,34,35,36,37,38,39,40,41,42,43,44,45,46,47
+            ,48,49,50,51,52,53,54,55,56,57,58,59,60,61,62,63,64,65]
+        y3 = [1,2,3,4,5,6,7,8,9,10,11,12,13,14,15,16,17,18,19,20,21,22,23]
+
+        #x3 and y3 are used for labeling the X and Y axis as amino acids in
+        #conjunciton with labelx and labely
+
+        x4 = [1,2,3,4,5,6,7,8,9,10,11,12,13,14,15,16,17,18,19,20,21,22,23,24,25,26,27,28,
+            29,30,31,32,33,34,35,36,37,38,39,40,41,42,43,44,45,46,47
+            ,48,49,50,51,52,53,54,55,56,57,58,59,60,61,62,63]
+
+        y4 = Module_Scanner.anticodon_isotype[:63]
+
+        #x4 and y4 are used to generate a "normal line" in the form of a
+        #step-wise function showing the expected isotype in regards to the
+        #anticodon Sequence
+
+        labelx = ['AGC', 'GGC', 'UGC', 'CGC', 'ACG', 'GCG', 'UCG',
+                'CCG', 'UCU', 'CCU', 'AUU', 'GUU', 'AUC', 'GUC',
+                'ACA', 'GCA', 'UUG', 'CUG', 'UUC', 'CUC', 'ACC', 'GCC',
+                'UCC', 'CCC', 'AUG', 'GUG', 'AAU', 'GAU', 'UAU', 'UAA',
+                'CAA', 'AAG', 'GAG', 'UAG', 'CAG', 'UUU', 'CUU', 'CAU',
+                'AAA', 'GAA', 'AGG', 'GGG', 'UGG', 'CGG', 'AGA', 'GGA',
+                'UGA', 'CGA', 'ACU', 'GCU', 'AGU', 'GGU', 'UGU', 'CGU',
+                'CCA', 'AUA', 'GUA', 'AAC', 'GAC', 'UAC', 'CAC', 'UCA',
+                'CUA', 'UUA', 'NNN']
+
+        labely = ['Ala','Arg','Asn','Asp','Cys',
+        'Gln', 'Glu', 'Gly','His', 'Ile',
+        'Leu','Lys','Met','Phe', 'Pro',
+        'Ser','Thr','Trp','Tyr', 'Val',
+        'SeC', 'Pyl', 'Ile2']
+        #names used for x and y axis
+        axes.step(x4,y4, lw = 2)
+    axes.set_xlabel('Anticodon')
+    axes.set_ylabel('Isotype')
+    axes.set_xticks(x3, labelx, rotation = 'vertical' if option == 'anticodon' else 'horizontal')
+    axes.set_yticks(y3, labely)
+    #labels the x and y axis' as amino acids.
+    axes.grid(True, which = 'major', linestyle = '-' ) #creates darker
+    #grid lines
+    return len(x3), len(y3)
+
+def draw_marks(axes, render, counts, shape):
+    '''
+    Draw the cells of counts on axes made by draw_frame, whose (X, Y) tick
+    counts are shape, as density, bubble or heatmap marks (see
+    Module_Scanner.plot). Returns the artists added, so they can be removed.
+    '''
+    if not counts: #nothing passed the cut off, the frame alone (no norm or colorbar to scale)
+        return []
+    cells = sorted(counts)
+    x = [cell[0] for cell in cells]
+    y = [cell[1] for cell in cells]
+    number = [counts[cell] for cell in cells]
+    if render == 'density':
+        from matplotlib.colors import to_rgba
+        return [axes.scatter(x,y, color = 'green'),
+                #n stacked magenta discs of alpha .1 look like one disc of alpha 1 - .9**n
+                axes.scatter(x,y, s = 400, color = [to_rgba('m', 1 - .9 ** count) for count in number])]
+    if render == 'bubble':
+        most = max(number, default = 1)
+        marks = axes.scatter(x,y, s = [20 + 380 * count / most for count in number], c = number, cmap = 'viridis')
+    elif render == 'heatmap':
+        from matplotlib.colors import LogNorm #counts span orders of magnitude
+        grid = np.zeros((max([shape[1]] + y), max([shape[0]] + x)))
+        for cell, count in counts.items():
+            grid[cell[1] - 1, cell[0] - 1] = count
+        marks = axes.imshow(np.ma.masked_equal(grid, 0), origin = 'lower', aspect = 'auto', cmap = 'viridis', norm = LogNorm(),
+                            interpolation = 'nearest', extent = (.5, grid.shape[1] + .5, .5, grid.shape[0] + .5))
+    return [marks, axes.figure.colorbar(marks, ax = axes, label = 'tRNAs')]
+
+def report_name(fname, fmt = 'tsv'):
+    '''File name of the supplemental report of fname'''
+    return fname + ('-suplemental data.txt' if fmt == 'tsv' else '-suplemental data.chim')
+
+def write_supplemental(computing, saveName, fmt = 'tsv'):
+    '''Write the chimeric tRNAs found by computing to saveName, return how many were written'''
+    with ChimeraWriter(saveName, fmt) as writer:
+        computing.export(writer)
+    return writer.rows
+
+def batch_files(source):
+    '''
+    Expand the batch source into a list of tRNAscan-SE files. The source is a
+    directory (every file in it), a glob pattern, or a manifest file listing one
+    path per line; relative manifest paths are taken from the manifest's folder.
+    '''
+    import glob
+    if os.path.isdir(source):
+        files = [os.path.join(source, name) for name in sorted(os.listdir(source))]
+        return [name for name in files if os.path.isfile(name)
+                and not name.endswith(('-suplemental data.txt', '-suplemental data.chim'))]#skip reports from earlier runs
+    if glob.has_magic(source):
+        return sorted(glob.glob(source))
+    files = []
+    with open(source) as manifest:
+        for line in manifest:
+            name = line.strip()
+            if name and not name.startswith('#'):
+                files.append(os.path.join(os.path.dirname(source), name))
+    return files
+
+def batch_scan(job):
+    '''
+    Worker for batch mode: scan one tRNAscan-SE file, write its supplemental
+    report and return its row of the combined summary table. Any error is caught
+    and put in the status column so one bad file does not stop the batch.
+    '''
+    fname, user_value, option, mod, filt, cache, report = job
+    try:
+        computing = Module_Scanner(fname, user_value, option, fname, mod, 'y', filt, cache = cache)
+        passed = len(computing.xtRNA())
+        chimeric = write_supplemental(computing, report_name(fname, report), report)
+        return (fname, len(computing.load()), passed, chimeric, 'ok')
+    except Exception as error:
+        return (fname, 0, 0, 0, type(error).__name__ + ': ' + str(error))
+
+def batch(source, user_value, option, mod, filt, workers = None, summary = 'chi-tRNA-summary.txt', cache = None,
+          report = 'tsv'):
+    '''
+    Scan every file named by source across a pool of worker processes and write
+    one combined summary table. Each file's report is written in format report
+    ('tsv' or 'bin'). Returns the number of files and of failures.
+    '''
+    from concurrent.futures import ProcessPoolExecutor
+    jobs = [(fname, user_value, option, mod, filt, cache, report) for fname in batch_files(source)]
+    workers = workers or os.cpu_count() or 1
+    chunk = max(1, len(jobs) // (workers * 4))#a few chunks per worker keeps them all busy
+    failed = 0
+    with ProcessPoolExecutor(max_workers = workers) as pool, open(summary, 'w') as saveFile:
+        saveFile.write('File\ttRNAs\tPassed\tChimeric\tStatus\n')
+        for row in pool.map(batch_scan, jobs, chunksize = chunk):
+            saveFile.write('\t'.join(str(value) for value in row) + '\n')
+            if row[-1] != 'ok':
+                failed += 1
+    return len(jobs), failed
+
+def species_name(fname):
+    '''Name of a genome in the comparative matrix: its file name without extensions'''
+    name = os.path.basename(fname)
+    for extension in ('.gz', '.bgz', '.zst', '.bz2', '.xz', '.txt', '.out'):
+        if name.endswith(extension):
+            name = name[:-len(extension)]
+    return name
+
+def species_names(fnames):
+    '''
+    species_name of every file, made unique: a name shared by several files
+    (e.g. genomeA/tRNAscan.out and genomeB/tRNAscan.out) gets the name of each
+    file's folder in front, then a number if that is still not enough. Every
+    renamed file is reported on stderr.
+    '''
+    names = [species_name(fname) for fname in fnames]
+    shared = Counter(names)
+    for number, fname in enumerate(fnames):
+        if 1 < shared[names[number]]:
+            names[number] = os.path.basename(os.path.dirname(os.path.abspath(fname))) + '-' + names[number]
+    shared = Counter(names)
+    seen = Counter()
+    for number, fname in enumerate(fnames):
+        name = names[number]
+        if name != species_name(fname) or 1 < shared[name]:
+            seen[name] += 1
+            if 1 < shared[name]:
+                names[number] = name + '-' + str(seen[name])
+            print(fname + ': another file has the same name, shown as ' + names[number], file = sys.stderr)
+    return names
+
+def compare_scan(job):
+    '''
+    Map step of comparative mode: reduce one tRNAscan-SE file to a sparse count
+    vector {(x, y): count} of its cells, or to an error message.
+    '''
+    fname, user_value, option, mod, filt, chimeric_only, cache = job
+    try:
+        computing = Module_Scanner(fname, user_value, option, fname, mod, 'N', filt, cache = cache)
+        counts = computing.counts()
+        if chimeric_only: #keep the cells off the normal line
+            counts = {cell: count for cell, count in counts.items() if not computing.normal(*cell)}
+        return fname, dict(counts), None
+    except Exception as error:
+        return fname, None, type(error).__name__ + ': ' + str(error)
+
+def compare(source, user_value, option, mod, filt, workers = None, chimeric_only = False, cache = None):
+    '''
+    Comparative mode: count the type (or anticodon) by isotype cells of every
+    file named by source in a pool of worker processes, and merge the sparse
+    vectors as they arrive into one species by cell matrix.
+    Returns the species names, the cells (x, y) in code order, the sparse
+    (species row, cell column, count) entries and the (file, error) failures.
+    '''
+    from concurrent.futures import ProcessPoolExecutor
+    fnames = batch_files(source)
+    names = dict(zip(fnames, species_names(fnames))) #species row names, unique
+    jobs = [(fname, user_value, option, mod, filt, chimeric_only, cache) for fname in fnames]
+    workers = workers or os.cpu_count() or 1
+    chunk = max(1, len(jobs) // (workers * 4))
+    species = []
+    vectors = []
+    failures = []
+    with ProcessPoolExecutor(max_workers = workers) as pool:
+        for fname, counts, error in pool.map(compare_scan, jobs, chunksize = chunk):
+            if error is None:
+                species.append(names[fname])
+                vectors.append(counts)
+            else:
+                failures.append((fname, error))
+    cells = sorted(set().union(*vectors))
+    column = {cell: number for number, cell in enumerate(cells)}
+    entries = [(row, column[cell], count) for row, counts in enumerate(vectors) for cell, count in counts.items()]
+    return species, cells, entries, failures
+
+def cell_names(cells, option):
+    '''Label cells as "X-axis name>isotype name"'''
+    xcode = Module_Scanner.aa_numeric if option == 'aa' else Module_Scanner.AntiNumeric
+    return [Module_Scanner.label(x, xcode) +'>'+ Module_Scanner.label(y, Module_Scanner.aa_numeric) for x, y in cells]
+
+def save_matrix(saveName, species, cells, entries, option):
+    '''
+    Write the species by cell matrix. A .npz name stores it sparse (row, column
+    and count arrays with the species and cell names) with NumPy, any other name
+    as a tab separated table with one row per species.
+    '''
+    names = cell_names(cells, option)
+    if saveName.endswith('.npz'):
+        rows, columns, counts = zip(*entries) if entries else ((), (), ())
+        np.savez_compressed(saveName, species = np.array(species), cells = np.array(names),
+                            row = np.array(rows, dtype = np.int32), column = np.array(columns, dtype = np.int32),
+                            count = np.array(counts, dtype = np.int64))
+        return
+    table = [[0] * len(cells) for name in species]
+    for row, column, count in entries:
+        table[row][column] = count
+    with open(saveName, 'w') as saveFile:
+        saveFile.write('Species\t' + '\t'.join(names) + '\n')
+        for name, counts in zip(species, table):
+            saveFile.write(name +'\t'+ '\t'.join(str(count) for count in counts) + '\n')
+
+def cluster_order(matrix):
+    '''
+    Order the rows of matrix so similar rows sit together: the leaf order of an
+    average linkage clustering of the row profiles when scipy is installed,
+    otherwise the order along their first principal component.
+    '''
+    if len(matrix) < 3:
+        return list(range(len(matrix)))
+    profiles = matrix / np.maximum(matrix.sum(axis = 1, keepdims = True), 1) #compare composition, not genome size
+    try:
+        from scipy.cluster.hierarchy import linkage, leaves_list
+        return leaves_list(linkage(profiles, 'average')).tolist()
+    except ImportError:
+        centred = profiles - profiles.mean(axis = 0)
+        component = np.linalg.svd(centred, full_matrices = False)[2][0]
+        return np.argsort(centred @ component).tolist()
+
+def plot_matrix(species, cells, entries, option, title, output = None):
+    '''Clustered heatmap of the species by cell matrix, rows and columns reordered by cluster_order'''
+    from matplotlib.colors import LogNorm
+    matrix = np.zeros((len(species), len(cells)))
+    for row, column, count in entries:
+        matrix[row, column] = count
+    rows = cluster_order(matrix)
+    columns = cluster_order(matrix.T)
+    matrix = matrix[rows][:, columns]
+    plt = pyplot(output is not None)
+    plt.rc('font', size = 8)
+    plt.figure('chi-tRNA matrix', clear = True, figsize = (min(4 + .15 * len(cells), 60), min(3 + .15 * len(species), 60)))
+    plt.imshow(np.ma.masked_equal(matrix, 0), aspect = 'auto', cmap = 'viridis', norm = LogNorm(), interpolation = 'nearest')
+    plt.colorbar(label = 'tRNAs')
+    names = cell_names(cells, option)
+    plt.xticks(range(len(columns)), [names[column] for column in columns], rotation = 'vertical')
+    if len(species) <= 200: #beyond that the names cannot be read anyway
+        plt.yticks(range(len(rows)), [species[row] for row in rows])
+    else:
+        plt.yticks([])
+    plt.xlabel('tRNA type > Isotype' if option == 'aa' else 'Anticodon > Isotype')
+    plt.ylabel('Species')
+    plt.title(title)
+    if output is None:
         plt.show()
+    else:
+        plt.savefig(output, bbox_inches = 'tight')
+
+class Renderer:
+    '''
+    Figure of one X-axis option reused across many genomes, drawn without
+    pyplot on the non-interactive Agg backend.
+
+    The static parts (draw_frame) are drawn once, when the renderer is made.
+    page() then adds the marks of each genome, saves the figure and removes
+    the marks again, so each further figure only costs its own marks. With
+    grid (rows, columns) the figure holds that many panels and a page draws
+    one genome per panel, as small multiples, with tick labels on the outer
+    panels of the page only.
+    '''
+
+    def __init__(self, option, render = 'density', grid = None):
+        from matplotlib import rc_context
+        from matplotlib.figure import Figure
+        self.render = 'density' if render == 'points' else render #only the cells are kept
+        rows, columns = grid or (1, 1)
+        self.grid = grid
+        self.style = {'font.size': 14 if grid is None else 8} #small multiples use smaller text
+        self.bbox = 'tight' if grid is None else None #the constrained layout already fits a page, saving a second draw
+        with rc_context(self.style):
+            if grid is None:
+                self.figure = Figure()
+            else:
+                width = 8 if option == 'anticodon' else 5 #65 anticodons need wider panels
+                self.figure = Figure(figsize = (width * columns, 4.5 * rows), layout = 'constrained')
+            self.panels = self.figure.subplots(rows, columns, squeeze = False).ravel()
+            self.shape = [draw_frame(axes, option) for axes in self.panels][0]
+        self.limits = [(axes.get_xlim(), axes.get_ylim()) for axes in self.panels] #view of the bare frame
+        self.marks = []
+
+    def page(self, genomes, output):
+        '''
+        Draw genomes, a list of (title, counts) with at most one per panel, and
+        save the figure to output (PNG, SVG or PDF by extension).
+        '''
+        from matplotlib import rc_context
+        with rc_context(self.style):
+            for number, axes in enumerate(self.panels):
+                axes.set_visible(number < len(genomes)) #panels left over on the last page
+                if self.grid is not None: #outer panels of this page: nothing drawn below, or first column
+                    bottom = len(genomes) <= number + self.grid[1]
+                    left = number % self.grid[1] == 0
+                    axes.tick_params(labelbottom = bottom, labelleft = left)
+                    axes.xaxis.label.set_visible(bottom)
+                    axes.yaxis.label.set_visible(left)
+                if number < len(genomes):
+                    title, counts = genomes[number]
+                    axes.set_title(title)
+                    self.marks.extend(draw_marks(axes, self.render, counts, self.shape))
+            try:
+                self.figure.savefig(output, bbox_inches = self.bbox)
+            finally:
+                self.clear()
+
+    def clear(self):
+        '''Remove the marks of the last page and its data and view limits, leaving the frame'''
+        for mark in reversed(self.marks): #colorbars before the marks they belong to
+            mark.remove()
+        self.marks = []
+        for axes, (xlim, ylim) in zip(self.panels, self.limits):
+            axes.relim() #back to the data limits of the normal line
+            axes.set_xlim(xlim, auto = True) #and its view, still rescaled by the next marks
+            axes.set_ylim(ylim, auto = True)
+
+renderers = {} #Renderer of each (option, render, grid), made once per worker process
+
+def render_page(job):
+    '''
+    Worker for --figures: count the cells of one page of tRNAscan-SE files,
+    given as (file, name) pairs, and draw them with this process's Renderer,
+    as one figure per file or one small multiples page. Returns the option,
+    the number of files drawn and the (file, error) failures.
+    '''
+    files, user_value, option, mod, filt, cache, render, grid, output = job
+    genomes = []
+    failures = []
+    for fname, name in files:
+        try:
+            computing = Module_Scanner(fname, user_value, option, name, mod, 'N', filt, cache = cache)
+            genomes.append((name, computing.counts()))
+        except Exception as error:
+            failures.append((fname, type(error).__name__ + ': ' + str(error)))
+    if genomes:
+        key = (option, render, grid)
+        if key not in renderers:
+            renderers[key] = Renderer(option, render, grid)
+        try:
+            renderers[key].page(genomes, output)
+        except Exception as error:
+            del renderers[key] #marks may be left on it, the next page gets a new one
+            return option, 0, failures + [(output, type(error).__name__ + ': ' + str(error))]
+    return option, len(genomes), failures
+
+def render_figures(source, user_value, options, mod, filt, folder, render = 'density', grid = None,
+                   fmt = 'png', workers = None, cache = None):
+    '''
+    Render a figure of every file named by source into folder for each X-axis
+    option in options, across one pool of worker processes: one file per genome
+    named after it (see species_names) and the option, or with grid (rows,
+    columns) pages of small multiples. Returns a Counter of the genomes drawn
+    per option and the (file, error) failures.
+    '''
+    from concurrent.futures import ProcessPoolExecutor
+    os.makedirs(folder, exist_ok = True)
+    fnames = batch_files(source)
+    files = list(zip(fnames, species_names(fnames)))
+    jobs = []
+    for option in options:
+        if grid is None:
+            for fname, name in files:
+                output = os.path.join(folder, name + '-' + option + '.' + fmt)
+                jobs.append(([(fname, name)], user_value, option, mod, filt, cache, render, grid, output))
+        else:
+            size = grid[0] * grid[1]
+            for start in range(0, len(files), size):
+                output = os.path.join(folder, '%s-page%04d.%s' % (option, start // size + 1, fmt))
+                jobs.append((files[start:start + size], user_value, option, mod, filt, cache, render, grid, output))
+    workers = workers or os.cpu_count() or 1
+    chunk = max(1, len(jobs) // (workers * 4))
+    drawn = Counter()
+    failures = []
+    with ProcessPoolExecutor(max_workers = workers) as pool:
+        for option, genomes, failed in pool.map(render_page, jobs, chunksize = chunk):
+            drawn[option] += genomes
+            failures.extend(failed)
+    return drawn, failures
+
+class ScanService:
+    '''
+    Parsed tables kept in memory by the analysis server (--serve).
+
+    Tables are keyed on file path and isotype column and evicted least recently
+    used first once their estimated size passes maxbytes. Each entry remembers
+    the size and mtime of its file and is parsed again when the file changes.
+    A ScanCache, when given, backs the parsing.
+    '''
+
+    def __init__(self, maxbytes, cache = None):
+        import threading
+        from collections import OrderedDict
+        self.maxbytes = maxbytes
+        self.cache = cache
+        self.tables = OrderedDict() #(path, mod): (size, mtime, nbytes, table)
+        self.used = 0
+        self.lock = threading.Lock()
+        self.drawing = threading.Lock() #pyplot keeps global state
+
+    def scanner(self, fname, user_value, option, mod, filt):
+        '''Module_Scanner for one query, its table taken from memory when still valid'''
+        key = (os.path.abspath(fname), mod)
+        stat = os.stat(fname)
+        computing = Module_Scanner(fname, user_value, option, fname, mod, 'y', filt, cache = self.cache)
+        with self.lock:
+            entry = self.tables.get(key)
+            if entry is not None and entry[:2] == (stat.st_size, stat.st_mtime_ns):
+                self.tables.move_to_end(key)
+                computing.table = entry[3]
+                return computing
+        table = computing.load() #parsed outside the lock, other queries go on
+        nbytes = table.nbytes()
+        with self.lock:
+            old = self.tables.pop(key, None)
+            if old is not None:
+                self.used -= old[2]
+            self.tables[key] = (stat.st_size, stat.st_mtime_ns, nbytes, table)
+            self.used += nbytes
+            while self.maxbytes < self.used and 1 < len(self.tables): #keep at least the newest table
+                self.used -= self.tables.popitem(last = False)[1][2]
+        return computing
+
+    def answer(self, path, query):
+        '''
+        Answer one query, returning (content type, body).
+        path is /points, /counts, /chimeras, /stats or /plot.png; query holds
+        file, and optionally cut (score cut off), option (aa or anticodon),
+        filter (inf or iso), mod (isotype column, counted from 1 as with -m)
+        and, for /plot.png, render.
+        '''
+        option = query.get('option', 'aa').lower()
+        filt = query.get('filter', 'inf')
+        if option not in ('aa', 'anticodon') or filt not in ('inf', 'iso'):
+            raise ValueError('option must be aa or anticodon and filter inf or iso')
+        computing = self.scanner(query['file'], float(query.get('cut', 0)), option, int(query['mod']) - 1 if 'mod' in query else None, filt)
+        xcode = Module_Scanner.aa_numeric if option == 'aa' else Module_Scanner.AntiNumeric
+        if path == '/points':
+            x, y = computing.project()
+            body = {'x': [int(value) for value in x], 'y': [int(value) for value in y]}
+        elif path == '/counts':
+            body = [[Module_Scanner.label(x, xcode), Module_Scanner.label(y, Module_Scanner.aa_numeric), x, y, count]
+                    for (x, y), count in sorted(computing.counts().items())]
+        elif path == '/chimeras':
+            table = computing.table
+            body = [[table.names[row], table.types[row], table.isotypes[row], table.begins[row],
+                     table.ends[row], table.inf_scores[row], table.iso_scores[row]] for row in computing.chimeras()]
+        elif path == '/stats':
+            computing.project()
+            computing.chimeras()
+            body = computing.counters
+        elif path == '/plot.png':
+            render = query.get('render', 'density')
+            if render not in ('points', 'density', 'bubble', 'heatmap'):
+                raise ValueError('unknown render ' + render)
+            computing.title = query.get('title', species_name(query['file']))
+            figure = io.BytesIO()
+            with self.drawing:
+                computing.plot(render, output = figure)
+            return 'image/png', figure.getvalue()
+        else:
+            raise LookupError('unknown query ' + path)
+        return 'application/json', json.dumps(body).encode()
+
+def serve(address, maxbytes, cache = None):
+    '''
+    Run the analysis server until interrupted. address is HOST:PORT for HTTP
+    over TCP (keep the host local, e.g. 127.0.0.1) or unix:PATH for HTTP over a
+    Unix socket. Queries are GET requests, see ScanService.answer.
+    '''
+    import socketserver
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import urlsplit, parse_qsl
+    service = ScanService(maxbytes, cache)
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlsplit(self.path)
+            try:
+                kind, body = service.answer(url.path, dict(parse_qsl(url.query)))
+                status = 200
+            except KeyError as error:
+                kind, body, status = 'text/plain', ('missing parameter ' + str(error)).encode(), 400
+            except (FileNotFoundError, LookupError) as error: #no such file or unknown query
+                kind, body, status = 'text/plain', str(error).encode(), 404
+            except Exception as error:
+                kind, body, status = 'text/plain', (type(error).__name__ + ': ' + str(error)).encode(), 400
+            self.send_response(status)
+            self.send_header('Content-Type', kind)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def address_string(self):
+            return str(self.client_address[0]) if self.client_address else 'unix'
+
+    if address.startswith('unix:'):
+        path = address[len('unix:'):]
+        if os.path.exists(path):
+            os.remove(path)
+        class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+            daemon_threads = True
+        server = Server(path, Handler)
+    else:
+        host, port = address.rsplit(':', 1)
+        server = ThreadingHTTPServer((host, int(port)), Handler)
+    print('chi-tRNA serving on', address, file = sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+def finish_profile(profile, computing, saveName):
+    '''Stop profiling, print the summary to stderr and save it as JSON'''
+    if profile is None:
+        return
+    profile.stop()
+    profile.counters.update(computing.counters)
+    print(profile.summary(), file = sys.stderr)
+    profile.save(saveName)
 
 def main (myCommandLine = None):
     if myCommandLine is None: #default parameters
@@ -429,21 +1808,25 @@ def main (myCommandLine = None):
         option = select.lower()
         user_value = float(input('State Minimum Inf Score or select \"0\": '))
         title = xfile
-        mod = 10
-        computing = Module_Scanner(xfile, user_value, option, title, mod)
+        mod = None #isotype column found from the header
         suplemental = input('Output chimeric tRNAs?[y/N]: ').lower()
-        if suplemental == 'y' or 'yes':
-            saveFile = open(xfile+'-suplemental data.txt', 'w')#standardize tabs by using length
-            saveFile.write('Sequence Name\t\t\t\t\ttRNA Type\tIsotype\n')
-            saveFile.write('-------------\t\t\t\t\t---------\t-------\n')
-            saveFile.write(computing.analysis())
-            saveFile.close()
-
+        supp = 'y' if suplemental in ('y', 'yes') else 'N'
+        computing = Module_Scanner(fname, user_value, option, title, mod, supp, 'inf')
+        if supp == 'y':
+            write_supplemental(computing, report_name(xfile))
 
         computing.plot()
 
     else: #additional options for users if they choose to utilize them
         myCommandLine = CommandLine(myCommandLine)
+        if myCommandLine.args.serve != None: #answers queries until interrupted
+            cache = None
+            if myCommandLine.args.cache != None:
+                cache = ScanCache(myCommandLine.args.cache, int(myCommandLine.args.cache_size * 2**20))
+            serve(myCommandLine.args.serve, int(myCommandLine.args.memory * 2**20), cache)
+            return
+        if myCommandLine.args.inFile == None:
+            myCommandLine.parser.error('the following arguments are required: inFile')
         fname = myCommandLine.args.inFile
         xfile = fname.replace('.txt','').replace('.out','')
         select = myCommandLine.args.option
@@ -458,25 +1841,133 @@ def main (myCommandLine = None):
         if myCommandLine.args.title != None:
             title = myCommandLine.args.title
 
-        mod = 10
+        mod = None #found from the header unless given
         if myCommandLine.args.mod != None:
             mod = myCommandLine.args.mod - 1
 
-        supp = myCommandLine.args.supplemental
-        if supp == 'y':
-            saveFile = open(fname+'-suplemental data.txt', 'w')#standardize tabs by using length
-            saveFile.write('Sequence Name\t\t\t\t\ttRNA Type\tIsotype\n')
-            saveFile.write('-------------\t\t\t\t\t---------\t-------\n')
-            saveFile.write(computing.analysis())
-            saveFile.close()
-
         filt = myCommandLine.args.filter
         if filt == None:
             filt = 'inf'
 
-        computing = Module_Scanner(fname, user_value, option, title, mod, supp, filt)
+        cache = None
+        if myCommandLine.args.cache != None:
+            cache = ScanCache(myCommandLine.args.cache, int(myCommandLine.args.cache_size * 2**20))
 
-        computing.plot()
+        profile = None
+        if myCommandLine.args.profile != None:
+            profile = Profile()
+
+        if myCommandLine.args.batch: #one report per file plus a summary, no plot
+            total, failed = batch(fname, user_value, option, mod, filt,
+                                  myCommandLine.args.workers, myCommandLine.args.summary, cache,
+                                  myCommandLine.args.report_format)
+            print('Scanned', total, 'files,', failed, 'failed; summary in', myCommandLine.args.summary)
+            return
+
+        if myCommandLine.args.compare: #one species by cell matrix over many files
+            species, cells, entries, failures = compare(fname, user_value, option, mod, filt, myCommandLine.args.workers,
+                                                        myCommandLine.args.chimeric_only, cache)
+            for failed, error in failures:
+                print(failed +': '+ error, file = sys.stderr)
+            save_matrix(myCommandLine.args.matrix, species, cells, entries, option)
+            print(len(species), 'species,', len(cells), 'cells,', len(failures), 'failed; matrix in', myCommandLine.args.matrix)
+            if species and cells and not myCommandLine.args.no_plot:
+                plot_matrix(species, cells, entries, option, title, myCommandLine.args.output)
+            return
+
+        if myCommandLine.args.figures != None: #one figure per file, or pages of small multiples
+            grid = None
+            if myCommandLine.args.grid != None:
+                try:
+                    grid = tuple(int(number) for number in myCommandLine.args.grid.lower().split('x'))
+                except ValueError:
+                    grid = ()
+                if len(grid) != 2 or min(grid) < 1:
+                    myCommandLine.parser.error('--grid must be ROWSxCOLUMNS, e.g. 4x5')
+            options = option.split(',')
+            drawn, failures = render_figures(fname, user_value, options, mod, filt, myCommandLine.args.figures,
+                                             myCommandLine.args.render, grid, myCommandLine.args.figure_format,
+                                             myCommandLine.args.workers, cache)
+            for failed, error in failures:
+                print(failed +': '+ error, file = sys.stderr)
+            for option in options:
+                print('Drew', drawn[option], 'genomes by', option)
+            print(len(failures), 'failed; figures in', myCommandLine.args.figures)
+            return
+
+        if myCommandLine.args.sweep != None: #one table of counts for many cut offs
+            start, stop, points = myCommandLine.args.sweep
+            points = max(1, int(points))
+            step = (stop - start) / (points - 1) if 1 < points else 0
+            computing = Module_Scanner(fname, user_value, option, title, mod, 'N', filt, cache = cache, profile = profile)
+            print('Cut off\tGroup\tPassed\tChimeric')
+            for cut, group, passed, chimeric in computing.sweep([start + step * number for number in range(points)]):
+                print('%g\t%s\t%d\t%d' % (cut, group, passed, chimeric))
+            finish_profile(profile, computing, myCommandLine.args.profile)
+            return
+
+        supp = myCommandLine.args.supplemental
+        report = myCommandLine.args.report_format
+        if myCommandLine.args.follow != None: #incremental updates while tRNAscan-SE runs
+            computing = Module_Scanner(fname, user_value, option, title, mod, supp, filt)
+            render = 'density' if myCommandLine.args.render == 'points' else myCommandLine.args.render
+            output = myCommandLine.args.output
+            writer = ChimeraWriter(report_name(fname, report), report) if supp == 'y' else None
+            def update(counts):
+                if writer is not None and writer.fmt == 'tsv':
+                    writer.f.flush()
+                counters = computing.counters
+                print('%s\ttRNAs %d\tpassed %d\tchimeric %d' % (time.strftime('%H:%M:%S'), counters['rows'],
+                      counters['passed'], counters['chimeric']), file = sys.stderr)
+                if output != None: #drawn aside and renamed, so viewers never see half a figure
+                    root, extension = os.path.splitext(output)
+                    computing.plot(render, counts, root + '.partial' + extension)
+                    os.replace(root + '.partial' + extension, output)
+            def restart(): #the file was rewritten, so is the report
+                nonlocal writer
+                writer.close()
+                writer = ChimeraWriter(report_name(fname, report), report)
+            try:
+                computing.follow(update, myCommandLine.args.follow, myCommandLine.args.idle,
+                                 (lambda *row: writer.write(*row)) if writer is not None else None,
+                                 restart if writer is not None else None)
+            except KeyboardInterrupt:
+                pass
+            finally:
+                if writer is not None:
+                    writer.close()
+            return
+
+        if myCommandLine.args.stream: #counts and chimeras without holding the file in memory
+            computing = Module_Scanner(fname, user_value, option, title, mod, supp, filt, profile = profile)
+            xcode = Module_Scanner.aa_numeric if option == 'aa' else Module_Scanner.AntiNumeric
+            if supp == 'y':
+                with ChimeraWriter(report_name(fname, report), report) as writer:
+                    counts = computing.stream(writer.write)
+            else:
+                counts = computing.stream()
+            print('X-Axis\tIsotype\tCount')
+            for (x, y), count in sorted(counts.items()):
+                print(Module_Scanner.label(x, xcode) +'\t'+ Module_Scanner.label(y, Module_Scanner.aa_numeric) +'\t'+ str(count))
+            if myCommandLine.args.output != None: #every tRNA is not kept, so draw the cells
+                render = 'density' if myCommandLine.args.render == 'points' else myCommandLine.args.render
+                computing.plot(render, counts, myCommandLine.args.output)
+            finish_profile(profile, computing, myCommandLine.args.profile)
+            return
+
+        computing = Module_Scanner(fname, user_value, option, title, mod, supp, filt, cache = cache, profile = profile)
+        if supp == 'y':
+            write_supplemental(computing, report_name(fname, report), report)
+
+        if myCommandLine.args.stats: #numbers only, matplotlib is never imported
+            print('tRNAs\t' + str(len(computing.load())))
+            print('Passed\t' + str(len(computing.xtRNA())))
+            print('Below cut off\t' + str(computing.counters['below cut off']))
+            print('Unknown codes\t' + str(computing.counters['unknown codes']))
+            print('Chimeric\t' + str(len(computing.chimeras())))
+        elif not myCommandLine.args.no_plot:
+            computing.plot(myCommandLine.args.render, output = myCommandLine.args.output)
+        finish_profile(profile, computing, myCommandLine.args.profile)
 
 if __name__ == "__main__":
     if (sys.argv[1:]):
@@ -0,0 +1,169 @@
+'''
+Regression tests for chi-tRNA.py: the points kept by project (list and NumPy
+paths) must be those of the original pop(0) implementation on the same input.
+
+run: python -m pytest -q  (or python -m unittest test_chi_tRNA)
+'''
+import os
+import shutil
+import tempfile
+import unittest
+import importlib.util
+
+folder = os.path.dirname(os.path.abspath(__file__))
+
+def load(name, fname):
+    '''Import a script of this folder whose file name is not a valid module name'''
+    spec = importlib.util.spec_from_file_location(name, os.path.join(folder, fname))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+chitrna = load('chi_tRNA', 'chi-tRNA.py')
+bench = load('chi_tRNA_bench', 'chi-tRNA-bench.py')
+Module_Scanner = chitrna.Module_Scanner
+
+def old_parser(fname):
+    '''parser() as first written: the lines after the three header lines, split at tabs'''
+    data = []
+    with open(fname) as f:
+        line = f.readline()
+        for line in f:
+            data.append(line.replace('\n','').split('\t'))
+    return data[2:]
+
+def old_column(data, index, convert):
+    '''One column of data, taken the way the original methods did: pop(0) until data is empty'''
+    data = list(data)
+    transfer = []
+    column = []
+    while 0 < len(data):
+        transfer.append(data[0])
+        column.append([entry[index] for entry in transfer])
+        transfer.pop(0)
+        data.pop(0)
+    return [convert(value) for sublist in column for value in sublist]
+
+def old_points(fname, option, filt, cut, mod = 10):
+    '''xtRNA and yisoType of the original implementation (tRNA_type, isoType, grab_numbers, plot_filter)'''
+    data = old_parser(fname)
+    if option == 'aa':
+        tRNA = old_column(data, 4, Module_Scanner.aa_numeric.__getitem__)
+    else:
+        tRNA = old_column(data, 5, Module_Scanner.AntiNumeric.__getitem__)
+    isotype = old_column(data, mod, Module_Scanner.aa_numeric.__getitem__)
+    scores = old_column(data, 8 if filt == 'inf' else -1, float)
+    restrictions = list(zip(tRNA, isotype, scores))
+    transfer = []
+    plot = []
+    while 0 < len(restrictions):
+        transfer.append(restrictions[0])
+        analyze = [entry[2] for entry in transfer]
+        if cut <= analyze[0]:
+            plot.append(restrictions[0])
+        transfer.pop(0)
+        restrictions.pop(0)
+    return [entry[0] for entry in plot], [entry[1] for entry in plot]
+
+class ProjectionTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.scratch = tempfile.mkdtemp(prefix = 'chi-tRNA-test-')
+        cls.fname = os.path.join(cls.scratch, 'synthetic.out')
+        bench.generate(cls.fname, 3000, chimera_rate = 0.05, seed = 1)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.scratch)
+
+    def check(self, vector):
+        for option in ('aa', 'anticodon'):
+            for filt in ('inf', 'iso'):
+                for cut in (0, 40, 60, 85, 200):
+                    with self.subTest(option = option, filt = filt, cut = cut, vector = vector):
+                        x, y = old_points(self.fname, option, filt, cut)
+                        computing = Module_Scanner(self.fname, cut, option, 'test', None, 'N', filt, vector = vector)
+                        self.assertEqual(x, [int(value) for value in computing.xtRNA()])
+                        self.assertEqual(y, [int(value) for value in computing.yisoType()])
+
+    def test_list_path(self):
+        self.check(False)
+
+    @unittest.skipIf(chitrna.np is None, 'NumPy is not installed')
+    def test_numpy_path(self):
+        self.check(True)
+
+class SweepTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.scratch = tempfile.mkdtemp(prefix = 'chi-tRNA-test-')
+        cls.fname = os.path.join(cls.scratch, 'unknown.out')
+        bench.generate(cls.fname, 2000, seed = 2)
+        with open(cls.fname) as f:
+            lines = f.readlines()
+        fields = lines[3].split('\t')
+        fields[10] = 'Foo' #an isotype missing from aa_numeric
+        lines[3] = '\t'.join(fields)
+        with open(cls.fname, 'w') as f:
+            f.writelines(lines)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.scratch)
+
+    def test_sweep_matches_single_runs(self):
+        for option in ('aa', 'anticodon'):
+            for cut in (0, 50, 80):
+                with self.subTest(option = option, cut = cut):
+                    computing = Module_Scanner(self.fname, cut, option, 'test', None, 'N', 'inf', vector = False)
+                    counts = {group: passed for threshold, group, passed, chimeric in computing.sweep([cut])}
+                    self.assertEqual(counts['All'], len(computing.xtRNA()))
+
+try:
+    import matplotlib
+except ImportError:
+    matplotlib = None
+
+@unittest.skipIf(matplotlib is None or chitrna.np is None, 'matplotlib and NumPy are needed to render')
+class RendererTest(unittest.TestCase):
+    '''A page of a reused Renderer must be the figure a fresh Renderer draws'''
+
+    @classmethod
+    def setUpClass(cls):
+        cls.scratch = tempfile.mkdtemp(prefix = 'chi-tRNA-test-')
+        cls.fname = os.path.join(cls.scratch, 'synthetic.out')
+        bench.generate(cls.fname, 2000, seed = 3)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.scratch)
+
+    def draw(self, renderer, genomes):
+        '''View limits and PNG digest of one page'''
+        import io
+        import hashlib
+        image = io.BytesIO()
+        limits = []
+        original = renderer.figure.savefig
+        def savefig(*args, **kwargs): #limits as drawn, before clear() resets them
+            original(*args, **kwargs)
+            limits.extend((axes.get_xlim(), axes.get_ylim()) for axes in renderer.panels)
+        renderer.figure.savefig = savefig
+        renderer.page(genomes, image)
+        del renderer.figure.savefig
+        return limits, hashlib.md5(image.getvalue()).hexdigest() #a short message when they differ
+
+    def test_reused_pages_match_fresh_ones(self):
+        for option in ('aa', 'anticodon'):
+            counts = Module_Scanner(self.fname, 0, option, 'test', None, 'N', 'inf').counts()
+            for render in ('density', 'bubble', 'heatmap'):
+                reused = chitrna.Renderer(option, render)
+                for title, cells in (('full', counts), ('empty', {}), ('full', counts)):
+                    with self.subTest(option = option, render = render, page = title):
+                        fresh = self.draw(chitrna.Renderer(option, render), [(title, cells)])
+                        self.assertEqual(self.draw(reused, [(title, cells)]), fresh)
+
+if __name__ == '__main__':
+    unittest.main()